@@ -0,0 +1,93 @@
+import argparse
+import sys
+from startup_trace import trace
+
+# Headless entry point: python -m autoclicker play macro.json ...
+# Tk is never imported, and the playback modules (pynput, Xlib) only when
+# the chosen mode needs them.
+
+def print_progress(cycles, stats):
+    print(f"{cycles} cycles, {stats.summary()}")
+
+def cmd_play(args):
+    with trace.phase("load macro"):
+        # Binary macros and recording journals are decoded lazily while the plan is compiled
+        from macro_format import load_events
+        try:
+            events = load_events(args.macro)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+    if not len(events):
+        print(f"Error: {args.macro} has no events.", file=sys.stderr)
+        return 2
+
+    if args.background and args.window_id is None:
+        print("Error: --background requires --window-id.", file=sys.stderr)
+        return 2
+    if args.relative and args.window_id is None:
+        print("Error: --relative requires --window-id.", file=sys.stderr)
+        return 2
+    # Macros saved since the relative flag was added say so themselves; --relative covers older ones
+    relative = args.relative or getattr(events, 'relative', False)
+    if relative and args.window_id is None:
+        print(f"Error: {args.macro} has window-relative positions; pass --window-id.", file=sys.stderr)
+        return 2
+
+    try:
+        if args.background:
+            with trace.phase("import background_player"):
+                from background_player import BackgroundPlayer
+            with trace.phase("create player"):
+                player = BackgroundPlayer(args.window_id, events, hold=args.hold / 1000, display_name=args.display,
+                                          relative=relative)
+        else:
+            with trace.phase("import player"):
+                from player import Player, create_backend
+            with trace.phase(f"create {args.backend} player"):
+                player = Player(events, backend=create_backend(args.backend, args.display),
+                                relative_to=args.window_id if relative else None, display_name=args.display)
+    except Exception as e:
+        print(f"Error: failed to start playback: {e}", file=sys.stderr)
+        return 1
+    trace.mark("ready to play")
+
+    if args.startup_trace:
+        print(trace.report())
+
+    try:
+        player.play(repetitions=None if args.forever else args.repeat, speed_multiplier=args.speed,
+                    duration=args.duration, deadline=args.until, on_progress=print_progress,
+                    progress_interval=args.progress_interval)
+    except KeyboardInterrupt:
+        player.stop()
+        print("Interrupted.")
+        return 130
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="autoclicker", description="Headless macro playback.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    play = subparsers.add_parser("play", help="Play a saved macro")
+    play.add_argument("macro", help="Macro file: .json, binary .acm or .jsonl recording journal")
+    play.add_argument("--repeat", type=int, default=1, help="Repetitions (default 1)")
+    play.add_argument("--forever", action="store_true", help="Loop until interrupted or a limit is reached")
+    play.add_argument("--duration", type=float, default=None, help="Stop after this many seconds")
+    play.add_argument("--until", type=float, default=None, help="Stop at this Unix time")
+    play.add_argument("--progress-interval", type=float, default=10.0, help="Seconds between progress lines (default 10)")
+    play.add_argument("--speed", type=float, default=1.0, help="Speed multiplier (default 1.0)")
+    play.add_argument("--window-id", type=lambda s: int(s, 0), default=None, help="Target window id, e.g. 0x1200007")
+    play.add_argument("--background", action="store_true", help="Send events to --window-id without moving the pointer")
+    play.add_argument("--relative", action="store_true", help="Macro positions are relative to --window-id (needed only for macros saved without the relative flag)")
+    play.add_argument("--backend", choices=["pynput", "xtest"], default="xtest", help="Foreground engine (default xtest)")
+    play.add_argument("--display", default=None, help="X display, e.g. :1 (default $DISPLAY)")
+    play.add_argument("--hold", type=float, default=0, help="Background press-hold in ms (default 0)")
+    play.add_argument("--startup-trace", action="store_true", help="Print import and startup timings")
+    play.set_defaults(func=cmd_play)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,50 +1,138 @@
-from Xlib import display, X
+from Xlib import X, Xatom
 from Xlib.protocol import event as xevent
+from struct import pack_into
+import threading
 import time
+from scheduler import FLUSH_GAP_NS, PlaybackScheduler
+from playback_plan import OP_BUTTON_DOWN, OP_BUTTON_UP, OP_CLICK, OP_KEY, OP_MOVE, OP_SCROLL, compile_plan
+from x_connection import connections
+from x_keymap import KeyMap
+from window_geometry import WindowGeometry
+from xtest_backend import scroll_buttons
+
+BUTTON_MASKS = {1: X.Button1Mask, 2: X.Button2Mask, 3: X.Button3Mask}
+CLOCK_MAX_AGE = 300.0 # Seconds a pooled ServerClock is reused before the offset is measured again
+
+class ServerClock:
+    """
+    Converts the local monotonic clock to X server time (milliseconds, wrapping at 2**32).
+    The offset is measured once, from the timestamp of a PropertyNotify we
+    trigger on a private unmapped window. The two clocks drift apart, so a
+    long-lived connection measures it again after CLOCK_MAX_AGE.
+    """
+
+    def __init__(self, disp):
+        root = disp.screen().root
+        window = root.create_window(-1, -1, 1, 1, 0, X.CopyFromParent, X.InputOnly, X.CopyFromParent,
+                                    event_mask=X.PropertyChangeMask)
+        atom = disp.intern_atom('_AUTOCLICKER_TIMESTAMP')
+        window.change_property(atom, Xatom.STRING, 8, b'')
+        disp.flush()
+        while True:
+            ev = disp.next_event()
+            if ev.type == X.PropertyNotify and ev.window.id == window.id:
+                break
+        self._base_ns = time.perf_counter_ns()
+        self._base_ms = ev.time
+        window.destroy()
+        disp.flush()
+
+    def now(self):
+        return (self._base_ms + (time.perf_counter_ns() - self._base_ns) // 1_000_000) & 0xFFFFFFFF
 
 class BackgroundPlayer:
-    def __init__(self, window, events):
+    def __init__(self, window, events, plan_cache=None, hold=0.05, display_name=None, relative=False):
+        """
+        :param window: Target window object or window id.
+        :param hold: Seconds between a button's press and release. With 0 both
+                     are queued together and consecutive clicks share flushes.
+        :param display_name: X display to connect to, e.g. ":1". Defaults to $DISPLAY.
+        :param relative: The macro's positions are relative to the target
+                         window rather than to the screen.
+        """
         self.window = window
         self.events = events
-        self.stop_requested = False
-        self.display = display.Display()
+        self.plan_cache = plan_cache # Optional PlanCache owned by the macro
+        self.hold = hold
+        self.relative = relative
+        self._geometries = {} # window id -> WindowGeometry
+        self._stop_event = threading.Event()
+        self.stats = None # Lateness stats of the last playback
+        # A pooled connection of our own, back to the pool when this player is
+        # dropped; its clock offset and KeyMap carry over to the next player
+        self.connection, self.close = connections.lease(self, display_name)
+        self.display = self.connection.display
+        self.root = self.display.screen().root
+        # Rebind the window to our own connection, so the events we queue go
+        # out with our flushes rather than on the connection that found it
+        self.window = self.display.create_resource_object('window', getattr(window, 'id', window))
+        self.clock = self._server_clock()
+        self.keymap = self.connection.cached('keymap', lambda: KeyMap(self.display))
+        self.traffic = None # XStats of the last playback
+        self._button_templates = {} # (window id, x, y, button_code) -> (press, release)
+        self._key_templates = {} # (window id, keycode, state) -> (press, release)
+        self._buttons_state = 0 # Mask of buttons held down by button_down events (drags)
+
+    def _server_clock(self):
+        return self.connection.cached('clock', lambda: ServerClock(self.display), max_age=CLOCK_MAX_AGE)
+
+    @property
+    def stop_requested(self):
+        return self._stop_event.is_set()
 
     def stop(self):
         """Signals the player to stop playback."""
-        self.stop_requested = True
+        self._stop_event.set()
 
-    def play(self, repetitions=1, speed_multiplier=1.0, on_complete_callback=None):
+    def play(self, repetitions=1, speed_multiplier=1.0, on_complete_callback=None,
+             duration=None, deadline=None, on_progress=None, progress_interval=1.0):
         """
         Plays the recorded events in the background on the target window.
+        Takes the same looping and limit options as Player.play.
         """
-        print(f"Starting background playback... (Repetitions: {repetitions}, Speed: {speed_multiplier}x)")
-        self.stop_requested = False
+        print(f"Starting background playback... (Repetitions: {repetitions or 'until stopped'}, Speed: {speed_multiplier}x)")
+        self._stop_event.clear()
 
         if speed_multiplier <= 0:
             speed_multiplier = 1.0
 
-        for i in range(repetitions):
-            if self.stop_requested:
-                break
-            
-            print(f"Repetition {i + 1}/{repetitions}")
-            for event in self.events:
-                if self.stop_requested:
-                    break
+        self.clock = self._server_clock()
+        steps = self._get_plan(speed_multiplier).steps
+
+        scheduler = PlaybackScheduler(self._stop_event)
+        scheduler.start()
+        scheduler.limit(duration, deadline)
+        self.stats = scheduler.stats
+        wait_ns = scheduler.wait_ns
+        flush = self.display.flush
+        traffic_before = self.connection.stats.copy()
+        send_button = self.send_button
+        send_key = self.send_key
 
-                delay = event['time'] / speed_multiplier
-                end_time = time.time() + delay
-                while time.time() < end_time:
-                    if self.stop_requested:
-                        break
-                    time.sleep(0.01)
+        for _ in scheduler.cycles(repetitions, on_progress, progress_interval):
+            for delay_ns, opcode, arg, x, y in steps:
+                # Send what is queued before sleeping, pipeline it otherwise
+                if delay_ns >= FLUSH_GAP_NS:
+                    flush()
+                    self._process_events()
 
-                if self.stop_requested:
+                if not wait_ns(delay_ns):
                     break
 
-                if event['type'] == 'click':
-                    self.send_click(event['x'], event['y'], event['button'])
+                if opcode == OP_CLICK:
+                    send_button(x, y, arg, flush=False)
+
+                elif opcode == OP_KEY:
+                    send_key(arg, flush=False)
+
+                else:
+                    self.send_pointer_step(opcode, arg, x, y)
+
+        flush()
 
+        self.traffic = self.connection.stats.since(traffic_before)
+        print(f"Played {scheduler.cycles_completed} cycles. Timing: {self.stats.summary()}")
+        print(f"X traffic: {self.traffic.summary()}")
         if self.stop_requested:
             print("Background playback stopped by user.")
         else:
@@ -54,51 +142,154 @@ class BackgroundPlayer:
             on_complete_callback()
 
     def send_click(self, x, y, button_str):
-        # This is the core of the background clicking logic
-        # We need to create and send a ButtonPress and ButtonRelease event
-        
         button_code = self._get_button_code(button_str)
-        if not button_code:
-            return
+        if button_code:
+            self.send_button(x, y, button_code)
 
-        # Create the events
-        press_event = self._create_button_event(X.ButtonPress, x, y, button_code)
-        release_event = self._create_button_event(X.ButtonRelease, x, y, button_code)
+    def send_button(self, x, y, button_code, flush=True, window=None):
+        # This is the core of the background clicking logic
+        # We send a ButtonPress and ButtonRelease event built from cached templates,
+        # only patching in the current server timestamp
+        window = window or self.window
+        press_event, release_event = self._button_events(window, x, y, button_code)
+        self._send(window, press_event)
 
-        # Send the events
-        self.window.send_event(press_event, propagate=True)
-        self.display.flush()
-        
-        time.sleep(0.05) # Small delay between press and release
-        
-        self.window.send_event(release_event, propagate=True)
-        self.display.flush()
+        if self.hold > 0:
+            self.display.flush()
+            time.sleep(self.hold) # Delay between press and release
 
+        self._send(window, release_event)
+        if flush:
+            self.display.flush()
 
-    def _create_button_event(self, event_type, x, y, button_code):
-        root = self.display.screen().root
-        
-        event_class = None
-        if event_type == X.ButtonPress:
-            event_class = xevent.ButtonPress
-        elif event_type == X.ButtonRelease:
-            event_class = xevent.ButtonRelease
-        else:
-            return None # Should not happen
+    def send_pointer_step(self, opcode, arg, x, y, window=None):
+        """Sends the motion, scroll and drag steps of a plan (OP_MOVE, OP_SCROLL, OP_BUTTON_DOWN/UP)."""
+        window = window or self.window
+        if opcode == OP_MOVE:
+            self._send(window, self._create_event(xevent.MotionNotify, window, x, y, 0, self._buttons_state))
+
+        elif opcode == OP_SCROLL:
+            for button, count in scroll_buttons(*arg):
+                press_event, release_event = self._button_events(window, x, y, button)
+                for _ in range(count):
+                    self._send(window, press_event)
+                    self._send(window, release_event)
+
+        elif opcode == OP_BUTTON_DOWN:
+            self._send(window, self._button_events(window, x, y, arg)[0])
+            self._buttons_state |= BUTTON_MASKS.get(arg, 0)
+
+        elif opcode == OP_BUTTON_UP:
+            # The release event reports the buttons held just before it, including its own
+            mask = BUTTON_MASKS.get(arg, 0)
+            self._send(window, self._create_event(xevent.ButtonRelease, window, x, y, arg, self._buttons_state | mask))
+            self._buttons_state &= ~mask
+
+    def send_key_str(self, key_str):
+        key = self.keymap.lookup_key_str(key_str)
+        if key:
+            self.send_key(key)
+
+    def send_key(self, key, flush=True, window=None):
+        """Sends a KeyPress and KeyRelease for a (keycode, state) pair from the KeyMap."""
+        window = window or self.window
+        press_event, release_event = self._key_events(window, key)
+        self._send(window, press_event)
+        self._send(window, release_event)
+        if flush:
+            self.display.flush()
+
+    def _send(self, window, event):
+        pack_into('=L', event._binary, 4, self.clock.now())
+        window.send_event(event, propagate=True)
+
+    def _button_events(self, window, x, y, button_code):
+        """Returns the cached (press, release) templates for a button at a position."""
+        cache_key = (window.id, x, y, button_code)
+        templates = self._button_templates.get(cache_key)
+        if templates is None:
+            templates = (
+                self._create_event(xevent.ButtonPress, window, x, y, button_code),
+                self._create_event(xevent.ButtonRelease, window, x, y, button_code),
+            )
+            self._button_templates[cache_key] = templates
+        return templates
 
-        return event_class(
-            time=int(time.time()),
-            root=root,
-            window=self.window,
+    def _key_events(self, window, key):
+        """Returns the cached (press, release) templates for a (keycode, state) pair."""
+        cache_key = (window.id,) + key
+        templates = self._key_templates.get(cache_key)
+        if templates is None:
+            keycode, state = key
+            templates = (
+                self._create_event(xevent.KeyPress, window, 0, 0, keycode, state, pointer=False),
+                self._create_event(xevent.KeyRelease, window, 0, 0, keycode, state, pointer=False),
+            )
+            self._key_templates[cache_key] = templates
+        return templates
+
+    def _process_events(self):
+        """
+        Handles queued events without blocking: a keyboard MappingNotify
+        rebuilds the KeyMap, a ConfigureNotify drops a target's cached origin.
+        """
+        while self.display.pending_events():
+            ev = self.display.next_event()
+            if self.keymap.handle_event(ev):
+                self._key_templates.clear()
+                if self.plan_cache is not None:
+                    self.plan_cache.invalidate()
+            elif ev.type in (X.ConfigureNotify, X.ReparentNotify, X.DestroyNotify):
+                # A target moved: its button templates carry the old root position
+                if any([geometry.handle_event(ev) for geometry in self._geometries.values()]):
+                    self._button_templates.clear()
+
+    def compile(self, speed_multiplier=1.0):
+        """Resolves the events into a PlaybackPlan of X button codes and (keycode, state) pairs."""
+        return compile_plan(self.events, speed_multiplier, self._get_button_code, self.keymap.lookup_key_str)
+
+    def _get_plan(self, speed_multiplier):
+        if self.plan_cache is None:
+            return self.compile(speed_multiplier)
+        return self.plan_cache.get(("xsendevent", speed_multiplier), lambda: self.compile(speed_multiplier))
+
+    def _geometry(self, window):
+        geometry = self._geometries.get(window.id)
+        if geometry is None:
+            geometry = self._geometries[window.id] = WindowGeometry(self.display, window)
+            self.connection.on_release.append(geometry.close)
+        return geometry
+
+    def _create_event(self, event_class, window, x, y, detail, state=0, pointer=True):
+        """
+        Builds a ButtonPress/ButtonRelease/MotionNotify/KeyPress/KeyRelease
+        event for a window. For pointer events (x, y) is converted so that the
+        event carries window coordinates and root carries screen coordinates,
+        using the window's cached origin.
+        """
+        event_x, event_y, root_x, root_y = x, y, x, y
+        if pointer:
+            ox, oy = self._geometry(window).origin()
+            if self.relative:
+                root_x, root_y = x + ox, y + oy
+            else:
+                event_x, event_y = x - ox, y - oy
+        event = event_class(
+            time=X.CurrentTime, # Patched with the server time on every send
+            root=self.root,
+            window=window,
             child=0,
-            root_x=x,
-            root_y=y,
-            event_x=x,
-            event_y=y,
-            state=0, # or the appropriate modifier mask
+            root_x=root_x,
+            root_y=root_y,
+            event_x=event_x,
+            event_y=event_y,
+            state=state, # Modifier mask
             same_screen=1,
-            detail=button_code
+            detail=detail
         )
+        # The packed event is sent as-is; a bytearray lets the timestamp be patched in place
+        event._binary = bytearray(event._binary)
+        return event
 
     def _get_button_code(self, button_str):
         if 'left' in button_str:
@@ -2,6 +2,16 @@ import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
 from tkinter import messagebox
 
+# Fields that can be edited per event type, besides time, with their parsers
+_POINTER_FIELDS = {'x': int, 'y': int, 'button': str}
+EDITABLE_FIELDS = {
+    'click': _POINTER_FIELDS,
+    'button_down': _POINTER_FIELDS,
+    'button_up': _POINTER_FIELDS,
+    'scroll': {'x': int, 'y': int, 'dx': int, 'dy': int},
+    'key_press': {'key': str},
+}
+
 class EditEventWindow(ttk.Toplevel):
     def __init__(self, master, event, index, on_save_callback):
         super().__init__(master)
@@ -36,13 +46,11 @@ class EditEventWindow(ttk.Toplevel):
             entry.grid(row=row, column=1, sticky="ew", padx=5, pady=5)
             
             # Disable fields that shouldn't be edited
-            if key in ['type']:
+            if key in ['type', 'path']:
                 entry.config(state="readonly")
             
-            # Disable irrelevant fields based on type
-            if self.event['type'] == 'click' and key not in ['type', 'time', 'x', 'y', 'button']:
-                 entry.config(state="disabled")
-            if self.event['type'] == 'key_press' and key not in ['type', 'time', 'key']:
+            # Disable irrelevant fields based on type (a move only has its time)
+            elif key != 'time' and key not in EDITABLE_FIELDS.get(self.event['type'], {}):
                  entry.config(state="disabled")
 
             row += 1
@@ -60,24 +68,25 @@ class EditEventWindow(ttk.Toplevel):
 
     def save_and_close(self):
         try:
-            # Rebuild the event dictionary safely
-            updated_event = {'type': self.event['type']}
+            # Rebuild the event dictionary safely; other types keep their
+            # non-editable data (e.g. a move's path) as-is
+            if self.event['type'] in ('click', 'key_press'):
+                updated_event = {'type': self.event['type']}
+            else:
+                updated_event = dict(self.event)
             
             # All events have a time
             updated_event['time'] = float(self.vars['time'].get())
 
-            if self.event['type'] == 'click':
-                updated_event['x'] = int(self.vars['x'].get())
-                updated_event['y'] = int(self.vars['y'].get())
-                updated_event['button'] = self.vars['button'].get()
-            elif self.event['type'] == 'key_press':
-                updated_event['key'] = self.vars['key'].get()
+            for key, parse in EDITABLE_FIELDS.get(self.event['type'], {}).items():
+                if key in self.vars:
+                    updated_event[key] = parse(self.vars[key].get())
 
             self.on_save(self.index, updated_event)
             self.destroy()
 
         except ValueError:
-            messagebox.showerror("Validation Error", "Invalid input. Please ensure time, x, and y are valid numbers.", parent=self)
+            messagebox.showerror("Validation Error", "Invalid input. Please ensure time and the position fields are valid numbers.", parent=self)
         except Exception as e:
             messagebox.showerror("Error", f"An unexpected error occurred: {e}", parent=self)
 
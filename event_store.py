@@ -0,0 +1,193 @@
+from array import array
+from macro_format import (EV_OTHER, EV_KEY, EV_MOVE, EV_SCROLL,
+                          TYPE_CODES, TYPE_NAMES, BUTTON_TYPES)
+
+class EventStore:
+    """
+    Columnar, list-like container for recorded events.
+
+    Events live in parallel typed arrays instead of one dict each: `times`
+    (seconds), `types` (the macro_format type codes), `xs`, `ys`, and two
+    operands `a`/`b` with the same meaning as in a binary macro record
+    (string id of the button/key, dx/dy of a scroll, path id of a move, or
+    the type name id of an unknown event). Strings are interned in
+    `strings`, and move paths are kept whole in `paths`; slots freed by
+    replaced or deleted move events are reused.
+
+    Indexing returns a fresh event dict and assigning a dict stores it, so
+    code written for a list of dicts keeps working; bulk code can use the
+    columns directly. `relative` is True when the positions are relative to
+    a window (see macro_format.FLAG_RELATIVE); it carries over from `events`.
+    """
+
+    def __init__(self, events=()):
+        self.times = array('d')
+        self.types = array('b')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.a = array('i')
+        self.b = array('i')
+        self.strings = []
+        self._string_ids = {}
+        self.paths = []
+        self._free_paths = [] # Slots in `paths` no event refers to
+        self.relative = getattr(events, 'relative', False)
+        self.extend(events)
+
+    def intern(self, s):
+        """Returns the id of `s` in the string table, adding it if needed."""
+        try:
+            return self._string_ids[s]
+        except KeyError:
+            self._string_ids[s] = len(self.strings)
+            self.strings.append(s)
+            return self._string_ids[s]
+
+    def string_id(self, s):
+        """Returns the id of `s`, or None if no event uses it."""
+        return self._string_ids.get(s)
+
+    def _new_path(self, path):
+        if self._free_paths:
+            slot = self._free_paths.pop()
+            self.paths[slot] = path
+            return slot
+        self.paths.append(path)
+        return len(self.paths) - 1
+
+    def free_paths(self, indices):
+        """Releases the path slots of the move events at `indices`; call before removing their rows."""
+        types, a = self.types, self.a
+        for index in indices:
+            if types[index] == EV_MOVE:
+                self.paths[a[index]] = None
+                self._free_paths.append(a[index])
+
+    def _encode(self, event, path_slot=None):
+        event_type = event.get('type')
+        code = TYPE_CODES.get(event_type, EV_OTHER)
+        a = b = 0
+        if code in BUTTON_TYPES:
+            a = self.intern(event.get('button', ''))
+        elif code == EV_KEY:
+            a = self.intern(event.get('key', ''))
+        elif code == EV_SCROLL:
+            a, b = int(event.get('dx', 0)), int(event.get('dy', 0))
+        elif code == EV_MOVE:
+            path = event.get('path') or []
+            if path_slot is None:
+                a = self._new_path(path)
+            else:
+                a = path_slot
+                self.paths[a] = path
+        else:
+            a = self.intern(str(event_type))
+        return (float(event.get('time', 0)), code, int(event.get('x', 0)), int(event.get('y', 0)), a, b)
+
+    def _decode(self, index):
+        code = self.types[index]
+        event = {"time": self.times[index], "type": TYPE_NAMES.get(code)}
+        if code in BUTTON_TYPES:
+            event.update(x=self.xs[index], y=self.ys[index], button=self.strings[self.a[index]])
+        elif code == EV_KEY:
+            event["key"] = self.strings[self.a[index]]
+        elif code == EV_SCROLL:
+            event.update(x=self.xs[index], y=self.ys[index], dx=self.a[index], dy=self.b[index])
+        elif code == EV_MOVE:
+            event["path"] = self.paths[self.a[index]]
+        else:
+            event["type"] = self.strings[self.a[index]]
+        return event
+
+    def _columns(self):
+        return (self.times, self.types, self.xs, self.ys, self.a, self.b)
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return EventStore(self._decode(i) for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event index out of range")
+        return self._decode(index)
+
+    def __setitem__(self, index, event):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("event index out of range")
+        old_slot = self.a[index] if self.types[index] == EV_MOVE else None
+        new_is_move = TYPE_CODES.get(event.get('type')) == EV_MOVE
+        if old_slot is not None and not new_is_move:
+            self.free_paths([index])
+        encoded = self._encode(event, old_slot if new_is_move else None)
+        for column, value in zip(self._columns(), encoded):
+            column[index] = value
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            self.free_paths(range(*index.indices(len(self))))
+        else:
+            if index < 0:
+                index += len(self)
+            if not 0 <= index < len(self):
+                raise IndexError("event index out of range")
+            self.free_paths([index])
+        for column in self._columns():
+            del column[index]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._decode(index)
+
+    def insert(self, index, event):
+        for column, value in zip(self._columns(), self._encode(event)):
+            column.insert(index, value)
+
+    def append(self, event):
+        for column, value in zip(self._columns(), self._encode(event)):
+            column.append(value)
+
+    def extend(self, events):
+        for event in events:
+            self.append(event)
+
+    def clear(self):
+        for column in self._columns():
+            del column[:]
+        self.paths = []
+        self._free_paths = []
+
+    def copy(self):
+        """Returns an independent snapshot; only the arrays are copied, paths are shared until replaced."""
+        store = EventStore()
+        store.times, store.types, store.xs, store.ys, store.a, store.b = (array(c.typecode, c) for c in self._columns())
+        store.strings = list(self.strings)
+        store._string_ids = dict(self._string_ids)
+        store.paths = list(self.paths)
+        store._free_paths = list(self._free_paths)
+        store.relative = self.relative
+        return store
+
+    def nbytes(self):
+        """Approximate memory used by the columns, excluding strings and paths."""
+        return sum(column.itemsize * len(column) for column in self._columns())
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+
+    count = 200000
+    events = [{"time": 0.01, "type": "click", "x": i % 800, "y": i % 600, "button": "Button.left"} for i in range(count)]
+    list_bytes = sys.getsizeof(events) + sum(sys.getsizeof(e) for e in events)
+
+    start = time.perf_counter()
+    store = EventStore(events)
+    elapsed = time.perf_counter() - start
+    print(f"{count} events: list of dicts ~{list_bytes / count:.0f} B/event, "
+          f"EventStore {store.nbytes() / count:.0f} B/event (built in {elapsed:.2f} s)")
+    print(store[0], store[-1], len(store[10:20]))
@@ -0,0 +1,49 @@
+import tkinter as tk
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+class FanoutMonitor(ttk.Toplevel):
+    """Per-window enable/stop controls and throughput counters for a FanoutPlayer."""
+
+    REFRESH_MS = 500
+
+    def __init__(self, master, player, window_names):
+        super().__init__(master)
+        self.title("Fan-out Playback")
+        self.transient(master)
+
+        self.player = player
+        self.rows = []
+        self.create_widgets(window_names)
+        self.refresh()
+
+    def create_widgets(self, window_names):
+        frame = ttk.Frame(self, padding="10")
+        frame.pack(fill=BOTH, expand=True)
+
+        for col, heading in enumerate(("Enabled", "Window", "Events", "Events/s", "")):
+            ttk.Label(frame, text=heading, font="-weight bold").grid(row=0, column=col, padx=5, sticky="w")
+
+        for row, (target, name) in enumerate(zip(self.player.targets, window_names), start=1):
+            enabled_var = tk.BooleanVar(value=target.enabled)
+            check = ttk.Checkbutton(frame, variable=enabled_var,
+                                    command=lambda t=target, v=enabled_var: setattr(t, 'enabled', v.get()))
+            check.grid(row=row, column=0, padx=5)
+            ttk.Label(frame, text=f"{name} ({target.window.id})").grid(row=row, column=1, padx=5, sticky="w")
+            events_label = ttk.Label(frame, text="0")
+            events_label.grid(row=row, column=2, padx=5, sticky="e")
+            rate_label = ttk.Label(frame, text="0.0")
+            rate_label.grid(row=row, column=3, padx=5, sticky="e")
+            stop_button = ttk.Button(frame, text="Stop", bootstyle=(DANGER, OUTLINE),
+                                     command=lambda t=target, v=enabled_var: (t.stop(), v.set(False)))
+            stop_button.grid(row=row, column=4, padx=5, pady=2)
+            self.rows.append((target, events_label, rate_label))
+
+    def refresh(self):
+        """Updates the counters; called every REFRESH_MS while the window is open."""
+        if not self.winfo_exists():
+            return
+        for target, events_label, rate_label in self.rows:
+            events_label.config(text=str(target.events_sent))
+            rate_label.config(text=f"{self.player.throughput(target):.1f}")
+        self.after(self.REFRESH_MS, self.refresh)
@@ -0,0 +1,111 @@
+import time
+from background_player import BackgroundPlayer
+from scheduler import FLUSH_GAP_NS, PlaybackScheduler
+from playback_plan import OP_CLICK, OP_KEY, OP_WAIT
+
+class FanoutTarget:
+    """One window of a fan-out playback, with its own enable switch and counters."""
+
+    def __init__(self, window):
+        self.window = window
+        self.enabled = True
+        self.events_sent = 0
+
+    def stop(self):
+        """Stops sending to this window; the others keep playing."""
+        self.enabled = False
+
+
+class FanoutPlayer(BackgroundPlayer):
+    """
+    Plays one macro into many windows from a single scheduler on one X
+    connection. At each event time the event is sent to every enabled
+    window before the connection is flushed.
+    """
+
+    def __init__(self, windows, events, plan_cache=None, hold=0.05, relative=False):
+        super().__init__(windows[0], events, plan_cache=plan_cache, hold=hold, relative=relative)
+        self.targets = [FanoutTarget(self.display.create_resource_object('window', window.id))
+                        for window in windows]
+        self.started_at = None # time.perf_counter() when playback began
+
+    def play(self, repetitions=1, speed_multiplier=1.0, on_complete_callback=None,
+             duration=None, deadline=None, on_progress=None, progress_interval=1.0):
+        print(f"Starting fan-out playback to {len(self.targets)} windows... (Repetitions: {repetitions or 'until stopped'}, Speed: {speed_multiplier}x)")
+        self._stop_event.clear()
+
+        if speed_multiplier <= 0:
+            speed_multiplier = 1.0
+
+        self.clock = self._server_clock()
+        steps = self._get_plan(speed_multiplier).steps
+        targets = self.targets
+        flush = self.display.flush
+        send = self._send
+
+        scheduler = PlaybackScheduler(self._stop_event)
+        scheduler.start()
+        scheduler.limit(duration, deadline)
+        self.stats = scheduler.stats
+        self.started_at = time.perf_counter()
+        wait_ns = scheduler.wait_ns
+        traffic_before = self.connection.stats.copy()
+
+        for _ in scheduler.cycles(repetitions, on_progress, progress_interval):
+            if not any(t.enabled for t in targets):
+                break
+
+            for delay_ns, opcode, arg, x, y in steps:
+                if delay_ns >= FLUSH_GAP_NS:
+                    flush()
+                    self._process_events()
+
+                if not wait_ns(delay_ns):
+                    break
+
+                active = [t for t in targets if t.enabled]
+                if opcode == OP_CLICK:
+                    pairs = [self._button_events(t.window, x, y, arg) for t in active]
+                elif opcode == OP_KEY:
+                    pairs = [self._key_events(t.window, arg) for t in active]
+                elif opcode == OP_WAIT:
+                    continue
+                else:
+                    # Motion, scroll and drag steps
+                    for target in active:
+                        self.send_pointer_step(opcode, arg, x, y, window=target.window)
+                        target.events_sent += 1
+                    continue
+
+                # Press in every window, then release in every window, so a
+                # hold applies once per event rather than once per window
+                for target, (press_event, _) in zip(active, pairs):
+                    send(target.window, press_event)
+                if opcode == OP_CLICK and self.hold > 0:
+                    flush()
+                    time.sleep(self.hold)
+                for target, (_, release_event) in zip(active, pairs):
+                    send(target.window, release_event)
+                    target.events_sent += 1
+
+        flush()
+
+        self.traffic = self.connection.stats.since(traffic_before)
+        print(f"Played {scheduler.cycles_completed} cycles. Timing: {self.stats.summary()}")
+        print(f"X traffic: {self.traffic.summary()}")
+        for target in targets:
+            print(f"Window {target.window.id}: {target.events_sent} events ({self.throughput(target):.1f} events/s)")
+        if self.stop_requested:
+            print("Fan-out playback stopped by user.")
+        else:
+            print("Fan-out playback finished.")
+
+        if on_complete_callback:
+            on_complete_callback()
+
+    def throughput(self, target):
+        """Average events per second sent to a target since playback began."""
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started_at
+        return target.events_sent / elapsed if elapsed > 0 else 0.0
@@ -0,0 +1,106 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from macro_format import load_events
+
+def parse_target(spec):
+    """Splits a "display[@window_id]" spec, e.g. ":3@0x1200007", into (display_name, window_id)."""
+    display_name, _, window = spec.partition('@')
+    return display_name, int(window, 0) if window else None
+
+def play_on_display(display_name, macro_path, window_id=None, repetitions=1, speed_multiplier=1.0):
+    """
+    Worker: plays a macro file on one X display and returns a result dict.
+    With a window id the events go to that window in the background,
+    otherwise they are injected in the foreground through XTEST.
+    """
+    result = {"display": display_name, "completed": False, "events": 0, "elapsed": 0.0,
+              "events_per_sec": 0.0, "lateness_mean_ms": 0.0, "lateness_max_ms": 0.0,
+              "jitter_ms": 0.0, "error": None}
+    try:
+        events = load_events(macro_path)
+
+        if window_id is not None:
+            from background_player import BackgroundPlayer
+            player = BackgroundPlayer(window_id, events, hold=0, display_name=display_name,
+                                      relative=events.relative)
+        elif events.relative:
+            raise ValueError("the macro has window-relative positions; give a window id")
+        else:
+            from player import Player
+            from xtest_backend import XTestBackend
+            player = Player(events, backend=XTestBackend(display_name))
+
+        start = time.perf_counter()
+        player.play(repetitions=repetitions, speed_multiplier=speed_multiplier)
+        elapsed = time.perf_counter() - start
+
+        stats = player.stats
+        result.update(completed=not player.stop_requested, events=stats.count, elapsed=elapsed,
+                      events_per_sec=stats.count / elapsed if elapsed > 0 else 0.0,
+                      lateness_mean_ms=stats.mean_ms, lateness_max_ms=stats.max_ms,
+                      jitter_ms=stats.jitter_ms)
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+def run_farm(targets, macro_path, repetitions=1, speed_multiplier=1.0, workers=None, on_result=None):
+    """
+    Plays a macro on many displays in a process pool and returns the results.
+
+    :param targets: List of (display_name, window_id or None).
+    :param workers: Pool size; defaults to one per display, capped at the number of cores.
+    :param on_result: Optional callback invoked with each result as it completes.
+    """
+    workers = workers or min(len(targets), os.cpu_count() or 1)
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_on_display, display_name, macro_path, window_id, repetitions, speed_multiplier)
+                   for display_name, window_id in targets]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+def summarize(results):
+    """Aggregates per-display results into totals."""
+    completed = [r for r in results if r["completed"]]
+    return {
+        "displays": len(results),
+        "completed": len(completed),
+        "failed": sum(1 for r in results if r["error"]),
+        "events": sum(r["events"] for r in results),
+        "events_per_sec": sum(r["events_per_sec"] for r in results),
+        "lateness_max_ms": max((r["lateness_max_ms"] for r in results), default=0.0),
+        "lateness_mean_ms": (sum(r["lateness_mean_ms"] * r["events"] for r in results) /
+                             max(1, sum(r["events"] for r in results))),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a macro on many X displays (e.g. an Xvfb farm) in parallel.")
+    parser.add_argument("macro", help="Macro file (.json, .acm or .jsonl)")
+    parser.add_argument("targets", nargs="+", help='Displays as "display[@window_id]", e.g. :1 :2@0x1200007')
+    parser.add_argument("--repeat", type=int, default=1, help="Repetitions per display")
+    parser.add_argument("--speed", type=float, default=1.0, help="Speed multiplier")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per display, up to the core count)")
+    args = parser.parse_args(argv)
+
+    def print_result(r):
+        status = "ok" if r["completed"] else (r["error"] or "stopped")
+        print(f"{r['display']:>8}  {status:<10}  {r['events']:>8} events  {r['events_per_sec']:>9.1f} ev/s  "
+              f"lateness mean {r['lateness_mean_ms']:.3f} ms, max {r['lateness_max_ms']:.3f} ms")
+
+    results = run_farm([parse_target(t) for t in args.targets], args.macro,
+                       repetitions=args.repeat, speed_multiplier=args.speed,
+                       workers=args.workers, on_result=print_result)
+    total = summarize(results)
+    print(f"Total: {total['completed']}/{total['displays']} displays completed, {total['events']} events, "
+          f"{total['events_per_sec']:.1f} ev/s, lateness mean {total['lateness_mean_ms']:.3f} ms, "
+          f"max {total['lateness_max_ms']:.3f} ms")
+    return 0 if total["completed"] == total["displays"] else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,6 +1,39 @@
+import queue
 import threading
+import time
 from pynput import keyboard
 
+# Modifier bits of a chord
+MOD_SHIFT = 1
+MOD_CTRL = 2
+MOD_ALT = 4
+MOD_SUPER = 8
+MOD_ALTGR = 16 # A modifier of its own: Mod5 on X, not Alt
+MOD_BITS = 5
+MOD_ALL = (1 << MOD_BITS) - 1
+
+_MODIFIER_NAMES = {'shift': MOD_SHIFT, 'ctrl': MOD_CTRL, 'alt': MOD_ALT, 'alt_gr': MOD_ALTGR,
+                   'cmd': MOD_SUPER, 'super': MOD_SUPER}
+
+def _held_bits():
+    """
+    Maps pynput modifier keys to bits of the held-modifier mask. Left keys
+    use the low MOD_BITS bits and right keys the next ones, so releasing one
+    Shift does not clear the other; (held | held >> MOD_BITS) & MOD_ALL
+    gives the chord mask.
+    """
+    bits = {}
+    for name, bit in (('shift', MOD_SHIFT), ('ctrl', MOD_CTRL), ('alt', MOD_ALT), ('cmd', MOD_SUPER)):
+        for suffix, shift in (('', 0), ('_l', 0), ('_r', MOD_BITS)):
+            key = getattr(keyboard.Key, name + suffix, None)
+            if key is not None:
+                bits[key] = bit << shift
+    if getattr(keyboard.Key, 'alt_gr', None) is not None:
+        bits[keyboard.Key.alt_gr] = MOD_ALTGR
+    return bits
+
+_HELD_BITS = _held_bits()
+
 def get_key_str(key):
     """Converts a pynput key object to a string representation."""
     if hasattr(key, 'char') and key.char is not None:
@@ -10,43 +43,152 @@ def get_key_str(key):
         return str(key)
     return None # Return None for unsupported types
 
+def _normalize_key(key_str):
+    # Shift changes the character, so letters are matched case-insensitively
+    return key_str.lower() if len(key_str) == 1 else key_str
+
+def parse_hotkey(text):
+    """
+    Parses a hotkey string into (modifier mask, key string). A chord joins
+    modifiers and the key with '+', e.g. "Key.ctrl+Key.alt+Key.f1";
+    "Key.f1" alone has no modifiers. Returns None for an empty string.
+    """
+    if not text:
+        return None
+    parts = text.split('+')
+    if text.endswith('+'):
+        parts = parts[:-2] + ['+'] # The key itself is '+'
+    mods = 0
+    for part in parts[:-1]:
+        name = part.strip().lower()
+        name = name[4:] if name.startswith('key.') else name
+        name = name.strip('<>')
+        if name.endswith(('_l', '_r')) and name != 'alt_gr':
+            name = name[:-2]
+        if name not in _MODIFIER_NAMES:
+            raise ValueError(f"Unknown modifier {part!r} in hotkey {text!r}")
+        mods |= _MODIFIER_NAMES[name]
+    key_str = parts[-1].strip() or parts[-1] # Keep a bare ' ' as the key
+    return mods, _normalize_key(key_str)
+
+def format_hotkey(mods, key_str):
+    """Inverse of parse_hotkey."""
+    names = [f"Key.{name}" for name, bit in (('ctrl', MOD_CTRL), ('alt', MOD_ALT), ('alt_gr', MOD_ALTGR),
+                                             ('shift', MOD_SHIFT), ('cmd', MOD_SUPER)) if mods & bit]
+    return '+'.join(names + [key_str])
+
+def build_dispatch_table(hotkeys):
+    """Maps (modifier mask, key string) -> action for a {action: hotkey string} dict."""
+    table = {}
+    for action, hotkey in hotkeys.items():
+        try:
+            chord = parse_hotkey(hotkey)
+        except ValueError as e:
+            print(f"Ignoring hotkey for {action}: {e}")
+            continue
+        if chord is not None:
+            table[chord] = action
+    return table
+
 class HotkeyListener(threading.Thread):
     def __init__(self, hotkeys, callbacks):
         """
-        :param hotkeys: A dictionary mapping actions to key strings, e.g., {"record": "Key.f1"}.
+        :param hotkeys: A dictionary mapping actions to key strings, e.g., {"record": "Key.f1"}
+                        or a chord such as {"play": "Key.ctrl+Key.alt+Key.f3"}.
         :param callbacks: A dictionary mapping actions to functions, e.g., {"record": on_record}.
+                          They run on a worker thread, never on the input thread.
         """
         super().__init__(daemon=True)
         self.hotkeys = hotkeys
         self.callbacks = callbacks
+        self._table = build_dispatch_table(hotkeys)
+        self._held = 0 # Bits of the modifier keys held down, see _HELD_BITS
         self._listener = None
+        self._queue = queue.SimpleQueue()
+        self._worker = threading.Thread(target=self._dispatch_loop, daemon=True)
+        # Time spent in on_press, to check that it stays flat however many hotkeys are bound
+        self.keystrokes = 0
+        self.press_ns = 0
 
     def run(self):
         """Starts the keyboard listener."""
+        self._worker.start()
         # Create and start the listener within the thread
-        with keyboard.Listener(on_press=self.on_press) as listener:
+        with keyboard.Listener(on_press=self.on_press, on_release=self.on_release) as listener:
             self._listener = listener
             listener.join()  # This blocks until the listener is stopped
 
     def on_press(self, key):
-        """Callback function for key presses."""
-        key_str = get_key_str(key)
-        for action, hotkey in self.hotkeys.items():
-            if key_str == hotkey and action in self.callbacks:
-                self.callbacks[action]()
+        """Callback function for key presses: one or two dict lookups, then a queue put on a match."""
+        start = time.perf_counter_ns()
+        bit = _HELD_BITS.get(key)
+        if bit is not None:
+            self._held |= bit
+        else:
+            key_str = get_key_str(key)
+            if key_str is not None:
+                key_str = _normalize_key(key_str)
+                held = self._held
+                table = self._table
+                # An exact chord wins; a plain hotkey also fires with modifiers held
+                action = table.get(((held | held >> MOD_BITS) & MOD_ALL, key_str))
+                if action is None and held:
+                    action = table.get((0, key_str))
+                if action is not None:
+                    self._queue.put(action)
+        self.keystrokes += 1
+        self.press_ns += time.perf_counter_ns() - start
+
+    def on_release(self, key):
+        bit = _HELD_BITS.get(key)
+        if bit is not None:
+            self._held &= ~bit
+
+    def _dispatch_loop(self):
+        while True:
+            action = self._queue.get()
+            if action is None:
+                return
+            callback = self.callbacks.get(action)
+            if callback is None:
+                continue
+            try:
+                callback()
+            except Exception as e:
+                print(f"Hotkey action {action!r} failed: {e}")
+
+    def overhead_ns(self):
+        """Mean time spent handling one keystroke, in nanoseconds."""
+        return self.press_ns / self.keystrokes if self.keystrokes else 0.0
 
     def stop(self):
         """Stops the keyboard listener."""
         if self._listener:
             self._listener.stop()
+        self._queue.put(None)
 
     def update_hotkeys(self, new_hotkeys):
         """Updates the hotkeys on the fly."""
         self.hotkeys = new_hotkeys
+        self._table = build_dispatch_table(new_hotkeys) # Swapped in whole; on_press never sees a partial table
+
+def create_hotkey_listener(hotkeys, callbacks, backend="pynput"):
+    """
+    Creates a hotkey listener by name: "pynput" (global keyboard hook) or
+    "xgrab" (XGrabKey on the root window). Falls back to pynput when the
+    grabs cannot be made.
+    """
+    if backend == "xgrab":
+        try:
+            from xgrab_hotkeys import XGrabHotkeyListener
+            return XGrabHotkeyListener(hotkeys, callbacks)
+        except Exception as e:
+            print(f"XGrabKey hotkeys unavailable ({e}), falling back to the pynput listener.")
+    return HotkeyListener(hotkeys, callbacks)
 
 if __name__ == '__main__':
     # Example Usage
-    import time
+    import sys
 
     def on_record():
         print("Record action triggered!")
@@ -61,6 +203,19 @@ if __name__ == '__main__':
     hotkey_config = {"record": "Key.f1", "stop": "Key.f2", "play": "Key.f3"}
     callback_map = {"record": on_record, "stop": on_stop, "play": on_play}
 
+    if "--bench" in sys.argv:
+        # Per-keystroke cost with 3 and with 300 bound hotkeys
+        for extra in (0, 297):
+            config = dict(hotkey_config, **{f"extra{i}": f"Key.ctrl+Key.alt+{chr(0x4e00 + i)}" for i in range(extra)})
+            bench = HotkeyListener(hotkeys=config, callbacks={})
+            keys = [keyboard.KeyCode.from_char(c) for c in "the quick brown fox"] + [keyboard.Key.shift]
+            for _ in range(20000):
+                for key in keys:
+                    bench.on_press(key)
+                bench.on_release(keyboard.Key.shift)
+            print(f"{len(config):>4} hotkeys: {bench.overhead_ns():.0f} ns per keystroke")
+        sys.exit()
+
     # Create and start the listener
     hotkey_thread = HotkeyListener(hotkeys=hotkey_config, callbacks=callback_map)
     hotkey_thread.start()
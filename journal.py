@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import time
+from array import array
+
+JOURNAL_VERSION = 1
+
+def _header(line):
+    """The journal's header dict if `line` is one, else None (also for journals written before headers)."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) and 'journal' in record else None
+
+class RecordingJournal:
+    """
+    Append-only on-disk log of recorded events, one compact JSON object per line.
+
+    A new journal starts with a header line, {"journal": 1, "relative": ...},
+    so a recovered recording still knows whether its positions are relative
+    to a window.
+
+    append() goes to the file instead of a list, so memory stays flat however
+    long the session runs. fsync is batched: it happens once `fsync_every`
+    events or `fsync_interval` seconds have accumulated, and on close(). After
+    a crash at most that last batch can be lost. A torn final line is skipped
+    by JournalEvents, and cut off by recover_journal() when a journal is
+    reopened with resume=True to append to it. Without resume the file must
+    not exist yet, so two sessions never share a journal.
+    """
+
+    def __init__(self, path, fsync_every=256, fsync_interval=1.0, relative=False, resume=False):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        if resume and os.path.exists(path):
+            recover_journal(path) # New lines must not continue a torn one
+        self._file = open(path, 'a' if resume else 'x', encoding='utf-8')
+        if self._file.tell() == 0:
+            self._file.write(json.dumps({"journal": JOURNAL_VERSION, "relative": relative}, separators=(',', ':')) + '\n')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock() # Mouse and keyboard listeners append from different threads
+
+    def append(self, event):
+        line = json.dumps(event, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync()
+
+    def sync(self):
+        """Flushes buffered lines and forces them to disk."""
+        with self._lock:
+            self._sync()
+
+    def _sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+
+
+def new_journal_path(directory):
+    """A journal path in `directory`, named after the current time, that no file uses yet."""
+    now = time.time()
+    stem = time.strftime("recording-%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+    path = os.path.join(directory, stem + ".jsonl")
+    n = 1
+    while os.path.exists(path):
+        n += 1
+        path = os.path.join(directory, f"{stem}-{n}.jsonl")
+    return path
+
+
+def recover_journal(path):
+    """
+    Makes a journal readable after a crash by truncating it after the last
+    complete, valid line. Returns the number of events kept.
+    """
+    count = 0
+    good_end = 0
+    with open(path, 'rb+') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            if good_end or _header(line) is None:
+                count += 1
+            good_end += len(line)
+        f.truncate(good_end)
+    return count
+
+
+class JournalEvents:
+    """
+    Read-only, lazily loaded view of a journal as a sequence of event dicts.
+
+    Only the byte offset of each line is held in memory (8 bytes per event);
+    events are parsed when indexed or iterated, so even very long recordings
+    open without materializing them. The header line, if any, is not an
+    event; its "relative" flag becomes the `relative` attribute.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.relative = False
+        self._offsets = array('Q')
+        offset = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break # Torn tail from a crash; see recover_journal()
+                header = _header(line) if offset == 0 else None
+                if header is not None:
+                    self.relative = bool(header.get('relative', False))
+                else:
+                    self._offsets.append(offset)
+                offset += len(line)
+        self._end = offset
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        start = self._offsets[index]
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return json.loads(f.readline())
+
+    def __iter__(self):
+        if not self._offsets:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offsets[0])
+            remaining = self._end - self._offsets[0]
+            for line in f:
+                if remaining <= 0:
+                    break
+                remaining -= len(line)
+                yield json.loads(line)
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    path = os.path.join(tempfile.mkdtemp(), "session.jsonl")
+    journal = RecordingJournal(path)
+    for i in range(10000):
+        journal.append({"time": 0.01, "type": "click", "x": i % 500, "y": i % 300, "button": "Button.left"})
+    journal.close()
+
+    # Simulate a crash in the middle of a write
+    with open(path, 'a') as f:
+        f.write('{"time": 0.01, "type": "cli')
+    print(f"Recovered {recover_journal(path)} events")
+
+    events = JournalEvents(path)
+    print(f"{len(events)} events, last: {events[-1]}")
@@ -0,0 +1,232 @@
+import json
+import mmap
+import struct
+
+# Binary macro layout (little endian), version 1:
+#   header   magic, version, flags (FLAG_*), event count, string count,
+#            path point count, then byte offsets of the record, string and
+#            path sections
+#   records  one fixed-size record per event, see RECORD
+#   strings  interned button/key/type names, each u16 length + UTF-8 bytes
+#   paths    (dt ns, x, y) points of "move" events, referenced by the records
+MAGIC = b'ACMB'
+VERSION = 1
+BINARY_EXTENSION = '.acm'
+
+HEADER = struct.Struct('<4sHHQIQQQQ')
+FLAG_RELATIVE = 1 # Positions are relative to a window's top-left corner, not the screen
+# delay ns, event type, x, y, a, b
+#   click/button_down/button_up: a = button string id
+#   key_press: a = key string id
+#   scroll: a = dx, b = dy
+#   move: a = first path point, b = number of points
+#   anything else: a = type name string id
+RECORD = struct.Struct('<qB3xiiii')
+PATH_POINT = struct.Struct('<qii')
+
+EV_OTHER = 0
+EV_CLICK = 1
+EV_KEY = 2
+EV_MOVE = 3
+EV_SCROLL = 4
+EV_BUTTON_DOWN = 5
+EV_BUTTON_UP = 6
+
+TYPE_CODES = {'click': EV_CLICK, 'key_press': EV_KEY, 'move': EV_MOVE, 'scroll': EV_SCROLL,
+              'button_down': EV_BUTTON_DOWN, 'button_up': EV_BUTTON_UP}
+TYPE_NAMES = {code: name for name, code in TYPE_CODES.items()}
+BUTTON_TYPES = (EV_CLICK, EV_BUTTON_DOWN, EV_BUTTON_UP)
+
+def _ns(seconds):
+    return round(seconds * 1_000_000_000)
+
+def save_binary(events, path):
+    """
+    Writes events (any iterable of event dicts) to `path` in the binary macro
+    format. A `relative` attribute on `events` sets FLAG_RELATIVE.
+    """
+    strings = {}
+    def intern(s):
+        try:
+            return strings[s]
+        except KeyError:
+            strings[s] = len(strings)
+            return strings[s]
+
+    records = bytearray()
+    points = bytearray()
+    point_count = 0
+    count = 0
+    for event in events:
+        event_type = event.get('type')
+        code = TYPE_CODES.get(event_type, EV_OTHER)
+        x = int(event.get('x', 0))
+        y = int(event.get('y', 0))
+        a = b = 0
+        if code in BUTTON_TYPES:
+            a = intern(event.get('button', ''))
+        elif code == EV_KEY:
+            a = intern(event.get('key', ''))
+        elif code == EV_SCROLL:
+            a, b = int(event.get('dx', 0)), int(event.get('dy', 0))
+        elif code == EV_MOVE:
+            vertices = event.get('path') or []
+            a, b = point_count, len(vertices)
+            for dt, px, py in vertices:
+                points += PATH_POINT.pack(_ns(dt), int(px), int(py))
+            point_count += len(vertices)
+        else:
+            a = intern(str(event_type))
+        records += RECORD.pack(_ns(event.get('time', 0)), code, x, y, a, b)
+        count += 1
+
+    table = bytearray()
+    for s in strings: # Insertion order == id order
+        encoded = s.encode('utf-8')
+        table += struct.pack('<H', len(encoded)) + encoded
+
+    records_offset = HEADER.size
+    strings_offset = records_offset + len(records)
+    paths_offset = strings_offset + len(table)
+    with open(path, 'wb') as f:
+        flags = FLAG_RELATIVE if getattr(events, 'relative', False) else 0
+        f.write(HEADER.pack(MAGIC, VERSION, flags, count, len(strings), point_count,
+                            records_offset, strings_offset, paths_offset))
+        f.write(records)
+        f.write(table)
+        f.write(points)
+
+
+class BinaryMacro:
+    """
+    Read-only sequence of event dicts backed by a memory-mapped binary macro.
+
+    Opening only reads the header and the (small) string table; records are
+    decoded straight from the mapping when they are indexed or iterated, so
+    load time does not depend on the number of events.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+        try:
+            (magic, version, flags, self._count, string_count, point_count,
+             self._records_offset, strings_offset, self._paths_offset) = HEADER.unpack_from(self._view, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a binary macro file.")
+            if version != VERSION:
+                raise ValueError(f"Unsupported binary macro version {version}.")
+            self.relative = bool(flags & FLAG_RELATIVE)
+
+            self.strings = []
+            offset = strings_offset
+            for _ in range(string_count):
+                (length,) = struct.unpack_from('<H', self._view, offset)
+                self.strings.append(bytes(self._view[offset + 2:offset + 2 + length]).decode('utf-8'))
+                offset += 2 + length
+        except Exception:
+            self.close()
+            raise
+
+    def __len__(self):
+        return self._count
+
+    def record(self, index):
+        """Returns the raw (delay_ns, type, x, y, a, b) record without building a dict."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("event index out of range")
+        return RECORD.unpack_from(self._view, self._records_offset + index * RECORD.size)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        return self._to_event(self.record(index))
+
+    def __iter__(self):
+        end = self._records_offset + self._count * RECORD.size
+        for record in RECORD.iter_unpack(self._view[self._records_offset:end]):
+            yield self._to_event(record)
+
+    def _to_event(self, record):
+        delay_ns, code, x, y, a, b = record
+        event = {"time": delay_ns / 1_000_000_000, "type": TYPE_NAMES.get(code)}
+        if code in BUTTON_TYPES:
+            event.update(x=x, y=y, button=self.strings[a])
+        elif code == EV_KEY:
+            event["key"] = self.strings[a]
+        elif code == EV_SCROLL:
+            event.update(x=x, y=y, dx=a, dy=b)
+        elif code == EV_MOVE:
+            start = self._paths_offset + a * PATH_POINT.size
+            event["path"] = [[dt / 1_000_000_000, px, py] for dt, px, py in
+                             PATH_POINT.iter_unpack(self._view[start:start + b * PATH_POINT.size])]
+        else:
+            event["type"] = self.strings[a]
+        return event
+
+    def close(self):
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def json_document(events):
+    """
+    The JSON form of a macro: a plain list of events, or for window-relative
+    macros {"relative": true, "events": [...]} (the events always last).
+    """
+    if getattr(events, 'relative', False):
+        return {"relative": True, "events": list(events)}
+    return list(events)
+
+def load_events(path):
+    """
+    Opens a macro by extension: binary macros and recording journals as lazy
+    sequences, anything else as a JSON macro loaded into an EventStore.
+    All of them have a `relative` attribute.
+    """
+    if path.endswith(BINARY_EXTENSION):
+        return BinaryMacro(path)
+    if path.endswith('.jsonl'):
+        from journal import JournalEvents
+        return JournalEvents(path)
+    with open(path, 'r') as f:
+        document = json.load(f)
+    relative = False
+    if isinstance(document, dict) and isinstance(document.get('events'), list):
+        relative = bool(document.get('relative', False))
+        document = document['events']
+    if not isinstance(document, list):
+        raise TypeError("JSON file does not contain a list of events.")
+    from event_store import EventStore
+    events = EventStore(document)
+    events.relative = relative
+    return events
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Convert macros between JSON and the binary format.")
+    parser.add_argument("source", help="Macro to read (.json, .jsonl or .acm)")
+    parser.add_argument("destination", help="Macro to write; .acm writes binary, anything else JSON")
+    args = parser.parse_args(argv)
+
+    events = load_events(args.source)
+    if args.destination.endswith(BINARY_EXTENSION):
+        save_binary(events, args.destination)
+    else:
+        with open(args.destination, 'w') as f:
+            json.dump(json_document(events), f, indent=4)
+    print(f"Converted {len(events)} events from {args.source} to {args.destination}")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
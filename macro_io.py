@@ -0,0 +1,199 @@
+import codecs
+import json
+import os
+import stat
+import tempfile
+from macro_format import BINARY_EXTENSION, save_binary
+
+# Macro load/save meant to run on a worker thread: JSON is parsed and written
+# incrementally, the caller gets events and progress in batches and can
+# cancel through a threading.Event, and saves never leave a half-written file.
+
+CHUNK_SIZE = 1 << 16
+BATCH_SIZE = 5000
+_WHITESPACE = ' \t\r\n'
+
+# mkstemp creates files as 0600; new macros get what open(path, 'w') would
+# give. Read once at import, since os.umask can only be read by setting it.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def iter_json_array(f, chunk_size=CHUNK_SIZE, on_read=None, info=None):
+    """
+    Yields the elements of a top-level JSON array from a binary file object
+    without reading the whole file. on_read(nbytes) is called after each chunk.
+    If `info` is a dict, the document may also be an object whose last member
+    is "events" (see macro_format.json_document); the members before it are
+    stored in `info` before the first element is yielded.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        if on_read:
+            on_read(len(chunk))
+        eof = not chunk
+        buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+        pos = 0
+
+    def next_char():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if eof:
+                raise ValueError("Unexpected end of JSON file.")
+            fill()
+
+    def next_value():
+        nonlocal pos
+        next_char()
+        while True:
+            try:
+                value, pos = decoder.raw_decode(buf, pos)
+                return value
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                fill() # The value continues in the next chunk
+
+    def expect(char):
+        nonlocal pos
+        found = next_char()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON object, found {found!r}.")
+        pos += 1
+
+    if info is not None and next_char() == '{':
+        pos += 1
+        while next_char() != '}':
+            key = next_value()
+            expect(':')
+            if key == 'events':
+                break
+            info[key] = next_value()
+            if next_char() != '}':
+                expect(',')
+    if next_char() != '[':
+        raise TypeError("JSON file does not contain a list of events.")
+    pos += 1
+    if next_char() == ']':
+        return
+    while True:
+        element = next_value()
+        yield element
+        separator = next_char()
+        pos += 1
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}.")
+
+def load_json_events(path, on_batch, cancel_event, batch_size=BATCH_SIZE, on_info=None):
+    """
+    Streams the events of a JSON macro to on_batch(events, fraction_done) in
+    batches of `batch_size`. on_info(info) gets the macro's metadata, e.g.
+    {"relative": True}, before the first batch. Returns the number of
+    events, or None if cancel_event was set.
+    """
+    total = os.path.getsize(path) or 1
+    read = 0
+    def on_read(nbytes):
+        nonlocal read
+        read += nbytes
+
+    count = 0
+    batch = []
+    info = {}
+    with open(path, 'rb') as f:
+        for event in iter_json_array(f, on_read=on_read, info=info):
+            if on_info is not None:
+                on_info(info)
+                on_info = None
+            if not isinstance(event, dict):
+                raise TypeError("JSON file contains something other than events.")
+            batch.append(event)
+            if len(batch) >= batch_size:
+                if cancel_event.is_set():
+                    return None
+                count += len(batch)
+                on_batch(batch, read / total)
+                batch = []
+    if on_info is not None:
+        on_info(info) # No events
+    count += len(batch)
+    on_batch(batch, 1.0)
+    return count
+
+def atomic_write(path, write_fn):
+    """
+    Calls write_fn(temp_path) to write a sibling temp file, then fsyncs and
+    renames it over `path`. If write_fn raises or returns False the temp file
+    is removed and `path` is left as it was. Returns write_fn's verdict.
+    The new file keeps the permissions of the one it replaces.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    os.close(fd)
+    try:
+        if write_fn(temp_path) is False:
+            os.remove(temp_path)
+            return False
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            mode = 0o666 & ~_UMASK
+        os.chmod(temp_path, mode)
+        with open(temp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def save_events(events, path, cancel_event, on_progress=None, batch_size=BATCH_SIZE):
+    """
+    Atomically saves events as JSON (same layout as json.dump(..., indent=4))
+    or, for .acm paths, in the binary format. on_progress(fraction_done) is
+    called between batches. Returns False if cancelled, leaving any existing
+    file at `path` untouched.
+    """
+    total = max(1, len(events))
+
+    relative = getattr(events, 'relative', False)
+
+    def write_json(temp_path):
+        with open(temp_path, 'w') as f:
+            if relative:
+                f.write('{"relative": true, "events": ') # See macro_format.json_document
+            f.write('[')
+            for index, event in enumerate(events):
+                if index % batch_size == 0 and index:
+                    if cancel_event.is_set():
+                        return False
+                    if on_progress:
+                        on_progress(index / total)
+                f.write(',\n    ' if index else '\n    ')
+                f.write(json.dumps(event, indent=4).replace('\n', '\n    '))
+            f.write('\n]' if len(events) else ']')
+            if relative:
+                f.write('}')
+        return True
+
+    def write_binary(temp_path):
+        save_binary(events, temp_path)
+        return not cancel_event.is_set()
+
+    saved = atomic_write(path, write_binary if path.endswith(BINARY_EXTENSION) else write_json)
+    if saved and on_progress:
+        on_progress(1.0)
+    return saved
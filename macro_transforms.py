@@ -0,0 +1,197 @@
+import random
+from array import array
+from macro_format import TYPE_CODES, BUTTON_TYPES, EV_KEY, EV_MOVE, EV_SCROLL
+
+# Bulk edits over the columns of an EventStore. With NumPy installed they run
+# as vectorized operations on zero-copy views of the store's arrays; without
+# it the same transforms fall back to plain loops over the arrays.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_POSITIONED = BUTTON_TYPES + (EV_SCROLL,)
+
+def _view(column):
+    """Writable NumPy view of an array.array (no copy)."""
+    return np.frombuffer(column, dtype=np.dtype(column.typecode)) if len(column) else np.empty(0, np.dtype(column.typecode))
+
+def _all(store, indices):
+    return range(len(store)) if indices is None else indices
+
+def select(store, start=0, stop=None, types=None, keys=None, region=None):
+    """
+    Returns the indices of events in [start, stop) that match every given filter.
+
+    :param types: Event type names to keep, e.g. {"click", "key_press"}.
+    :param keys: Key strings to keep; only key_press events can match.
+    :param region: (x0, y0, x1, y1), inclusive; only events with a position can match.
+    """
+    stop = len(store) if stop is None else min(stop, len(store))
+    start = max(0, start)
+    codes = None if types is None else [TYPE_CODES.get(t, -1) for t in types]
+    key_ids = None if keys is None else [store.string_id(k) for k in keys if store.string_id(k) is not None]
+
+    if np is not None:
+        mask = np.ones(max(0, stop - start), dtype=bool)
+        type_col = _view(store.types)[start:stop]
+        if codes is not None:
+            mask &= np.isin(type_col, codes)
+        if key_ids is not None:
+            mask &= (type_col == EV_KEY) & np.isin(_view(store.a)[start:stop], key_ids)
+        if region is not None:
+            x0, y0, x1, y1 = region
+            xs = _view(store.xs)[start:stop]
+            ys = _view(store.ys)[start:stop]
+            mask &= np.isin(type_col, _POSITIONED) & (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+        return (np.flatnonzero(mask) + start).tolist()
+
+    result = []
+    types_col, xs, ys, a = store.types, store.xs, store.ys, store.a
+    for i in range(start, stop):
+        code = types_col[i]
+        if codes is not None and code not in codes:
+            continue
+        if key_ids is not None and (code != EV_KEY or a[i] not in key_ids):
+            continue
+        if region is not None:
+            x0, y0, x1, y1 = region
+            if code not in _POSITIONED or not (x0 <= xs[i] <= x1 and y0 <= ys[i] <= y1):
+                continue
+        result.append(i)
+    return result
+
+def scale_delays(store, factor, indices=None):
+    """Multiplies the delays of the selected events (all if `indices` is None) by `factor`."""
+    if np is not None:
+        times = _view(store.times)
+        if indices is None:
+            times *= factor
+        else:
+            times[indices] *= factor
+        return
+    times = store.times
+    for i in _all(store, indices):
+        times[i] *= factor
+
+def clamp_delays(store, minimum=None, maximum=None, indices=None):
+    """Limits the delays of the selected events to [minimum, maximum] seconds."""
+    if np is not None:
+        times = _view(store.times)
+        sel = slice(None) if indices is None else indices
+        times[sel] = np.clip(times[sel], minimum, maximum)
+        return
+    times = store.times
+    for i in _all(store, indices):
+        t = times[i]
+        if minimum is not None and t < minimum:
+            t = minimum
+        if maximum is not None and t > maximum:
+            t = maximum
+        times[i] = t
+
+def _positioned(store, indices):
+    """Splits the selection into events with an x/y position and move events."""
+    if np is not None:
+        idx = np.arange(len(store)) if indices is None else np.asarray(indices, dtype=np.intp)
+        types = _view(store.types)[idx]
+        return idx[np.isin(types, _POSITIONED)], idx[types == EV_MOVE].tolist()
+    positioned = []
+    moves = []
+    types = store.types
+    for i in _all(store, indices):
+        if types[i] in _POSITIONED:
+            positioned.append(i)
+        elif types[i] == EV_MOVE:
+            moves.append(i)
+    return positioned, moves
+
+def _map_paths(store, moves, fn):
+    # Paths are few and variable-length, so they are rewritten in Python.
+    # They are replaced, not edited, so events handed out earlier keep their path.
+    for i in moves:
+        path_id = store.a[i]
+        store.paths[path_id] = [[dt, *fn(x, y)] for dt, x, y in store.paths[path_id]]
+
+def transform_coords(store, scale_x=1.0, scale_y=1.0, shift_x=0, shift_y=0, indices=None):
+    """
+    Maps the positions of the selected events (and their move paths) to
+    x * scale_x + shift_x, y * scale_y + shift_y, rounded to pixels. Use the
+    scale for a resolution change, e.g. 2560/1920.
+    """
+    positioned, moves = _positioned(store, indices)
+    if np is not None:
+        for column, scale, shift in ((store.xs, scale_x, shift_x), (store.ys, scale_y, shift_y)):
+            values = _view(column)
+            values[positioned] = np.rint(values[positioned] * scale + shift)
+    else:
+        xs, ys = store.xs, store.ys
+        for i in positioned:
+            xs[i] = round(xs[i] * scale_x + shift_x)
+            ys[i] = round(ys[i] * scale_y + shift_y)
+    _map_paths(store, moves, lambda x, y: (round(x * scale_x + shift_x), round(y * scale_y + shift_y)))
+
+def add_jitter(store, delay=0.0, position=0, seed=None, indices=None):
+    """
+    Adds uniform random noise: up to +/- `delay` seconds to each selected
+    delay (never below zero) and up to +/- `position` pixels to each
+    position. The same seed gives the same result.
+    """
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        idx = np.arange(len(store)) if indices is None else np.asarray(indices, dtype=np.intp)
+        if delay:
+            times = _view(store.times)
+            times[idx] = np.maximum(0.0, times[idx] + rng.uniform(-delay, delay, len(idx)))
+        if position:
+            positioned, _ = _positioned(store, idx)
+            for column in (store.xs, store.ys):
+                values = _view(column)
+                values[positioned] += rng.integers(-position, position, len(positioned), endpoint=True, dtype=values.dtype)
+        return
+    rng = random.Random(seed)
+    times = store.times
+    indices = list(_all(store, indices))
+    if delay:
+        for i in indices:
+            times[i] = max(0.0, times[i] + rng.uniform(-delay, delay))
+    if position:
+        positioned, _ = _positioned(store, indices)
+        xs, ys = store.xs, store.ys
+        for i in positioned:
+            xs[i] += rng.randint(-position, position)
+            ys[i] += rng.randint(-position, position)
+
+def delete_events(store, indices):
+    """Removes the given events in one pass instead of one deletion per event."""
+    store.free_paths(indices)
+    columns = (store.times, store.types, store.xs, store.ys, store.a, store.b)
+    if np is not None:
+        keep = np.ones(len(store), dtype=bool)
+        keep[np.asarray(indices, dtype=np.intp)] = False
+        kept = [_view(column)[keep].tobytes() for column in columns]
+    else:
+        drop = set(indices)
+        kept = [array(column.typecode, (v for i, v in enumerate(column) if i not in drop)).tobytes()
+                for column in columns]
+    for column, data in zip(columns, kept):
+        del column[:]
+        column.frombytes(data)
+
+
+if __name__ == '__main__':
+    import time
+    from event_store import EventStore
+
+    count = 500000
+    store = EventStore({"time": 0.01, "type": "click", "x": i % 1920, "y": i % 1080, "button": "Button.left"}
+                       for i in range(count))
+    print(f"{count} events, NumPy {'available' if np is not None else 'not installed'}")
+    for name, fn in (("scale delays", lambda: scale_delays(store, 0.5)),
+                     ("clamp delays", lambda: clamp_delays(store, 0.002, 0.004)),
+                     ("1080p -> 1440p", lambda: transform_coords(store, 2560 / 1920, 1440 / 1080)),
+                     ("jitter", lambda: add_jitter(store, delay=0.001, position=2, seed=1)),
+                     ("select region", lambda: select(store, region=(0, 0, 100, 100)))):
+        start = time.perf_counter()
+        fn()
+        print(f"{name:<16} {(time.perf_counter() - start) * 1000:8.1f} ms")
@@ -1,72 +1,117 @@
-import tkinter as tk
-import ttkbootstrap as ttk
-from ttkbootstrap.constants import *
-from tkinter import filedialog, messagebox
+import sys
+from startup_trace import trace
+
+# Imports are grouped into timed phases; run with --startup-trace to print them.
+# Dialogs, players, the recorder and anything pulling in pynput or Xlib are
+# imported on first use so they stay off the cold start path.
+with trace.phase("import tkinter, ttkbootstrap"):
+    import tkinter as tk
+    import ttkbootstrap as ttk
+    from ttkbootstrap.constants import *
+    from tkinter import filedialog, messagebox
 import threading
-import json
-from pynput import mouse
-from Xlib import display
-from recorder import Recorder
-from player import Player
-from background_player import BackgroundPlayer
+from collections import deque
+from playback_plan import PlanCache
+from event_store import EventStore
 from settings_manager import SettingsManager
-from window_selector import WindowSelector
-from settings_window import SettingsWindow
-from hotkey_listener import HotkeyListener
-from edit_window import EditEventWindow
-from add_event_dialog import AddEventDialog # Added for AddEventDialog
+
+# Recorded events are drained into the action list at most this often (~30 Hz)
+DRAIN_INTERVAL_MS = 33
+# Recent events shown while recording to a journal
+JOURNAL_PREVIEW_ROWS = 1000
 
 class AutoClickerGUI(ttk.Window):
     def __init__(self):
-        super().__init__() # Initialize Tkinter first
-
-        # Load settings before applying the theme
-        self.settings_manager = SettingsManager()
-        self.settings = self.settings_manager.load_settings()
+        # Load settings before creating the window, so only the chosen theme is built
+        with trace.phase("load settings"):
+            self.settings_manager = SettingsManager()
+            self.settings = self.settings_manager.load_settings()
         theme_name = self.settings.get("theme", "litera")
-        self.style.theme_use(theme_name) # Apply the theme after initialization
+        with trace.phase("create window and theme"):
+            super().__init__(themename=theme_name)
         
         self.title("Auto Clicker")
         self.geometry("450x700") # Increased size for better layout
 
         # Core components
         self.recorder = None
-        self.recorded_events = []
+        self.recorded_events = EventStore()
+        self.plan_cache = PlanCache() # Compiled playback plans, invalidated on every edit
         self.recorder_thread = None
+        self.pending_actions = deque() # Recorder thread -> Tk loop, drained every DRAIN_INTERVAL_MS
+        self._drain_job = None
+        self._journaling = False # Recording straight to a journal file instead of self.recorded_events
+        self._recorded_count = 0
+        self._io_cancel = None # threading.Event of the running load/save, if any
         self.player_thread = None
         self.player = None # Added for interruptible playback
         self.target_window = None # For background clicking
+        self.target_windows = [] # All selected windows; more than one plays in fan-out mode
 
-        # Hotkeys (COMMENTED OUT FOR DEBUGGING)
-        self.hotkey_listener = self.setup_hotkey_listener()
-        self.hotkey_listener.start()
+        # Hotkeys are started once the window is up (see _finish_startup)
+        self.hotkey_listener = None
 
-        self.create_menu()
-        self.create_widgets()
+        with trace.phase("create menu"):
+            self.create_menu()
+        with trace.phase("create widgets"):
+            self.create_widgets()
         
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.after_idle(self._finish_startup)
+
+    def _finish_startup(self):
+        """Deferred startup work, run from the event loop after the window is mapped."""
+        trace.mark("window mapped")
+        with trace.phase("start hotkey listener"):
+            self.hotkey_listener = self.setup_hotkey_listener()
+            self.hotkey_listener.start()
+        if "--startup-trace" in sys.argv:
+            print(trace.report())
 
     def select_target_window(self):
+        from window_selector import WindowSelector
         dialog = WindowSelector(self)
         self.wait_window(dialog)
         
         if dialog.selected_window:
             self.target_window = dialog.selected_window
-            window_name = self.target_window.get_wm_name() or self.target_window.get_icccm_name() or "Unknown"
-            self.target_window_label.config(text=f"Target: {window_name} ({self.target_window.id})")
-            self.status_bar.config(text="Status: Target window selected.")
+            self.target_windows = dialog.selected_windows
+            if len(self.target_windows) > 1:
+                self.target_window_label.config(text=f"Targets: {len(self.target_windows)} windows")
+                self.status_bar.config(text="Status: Target windows selected.")
+            else:
+                window_name = self._window_name(self.target_window)
+                self.target_window_label.config(text=f"Target: {window_name} ({self.target_window.id})")
+                self.status_bar.config(text="Status: Target window selected.")
         else:
             self.status_bar.config(text="Status: No target window selected.")
 
+    def _relative_window(self):
+        """The target window if new recordings use window-relative positions (the "window_relative" setting), else None."""
+        if not self.settings.get("window_relative", False):
+            return None
+        if self.target_window is None:
+            print("Window-relative positions need a target window; using screen positions.")
+        return self.target_window
+
+    def _window_name(self, window):
+        from window_index import get_index
+        info = get_index().get(window.id) # Cached, no round trip
+        if info and info.title:
+            return info.title
+        return window.get_wm_name() or window.get_icccm_name() or "Unknown"
+
     def setup_hotkey_listener(self):
+        from hotkey_listener import create_hotkey_listener
         callbacks = {
             "record": lambda: self.after(0, self.start_recording),
             "stop": lambda: self.after(0, self.smart_stop), # Changed
             "play": lambda: self.after(0, self.play_macro),
         }
-        return HotkeyListener(
+        return create_hotkey_listener(
             hotkeys=self.settings.get("hotkeys", {}),
-            callbacks=callbacks
+            callbacks=callbacks,
+            backend=self.settings.get("hotkey_backend", "pynput")
         )
 
     def smart_stop(self):
@@ -92,23 +137,33 @@ class AutoClickerGUI(ttk.Window):
         menubar.add_cascade(label="File", menu=file_menu)
         file_menu.add_command(label="Save Macro", command=self.save_macro)
         file_menu.add_command(label="Load Macro", command=self.load_macro)
+        file_menu.add_command(label="Open Recording Journal...", command=self.open_journal)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.on_closing)
 
         edit_menu = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Edit", menu=edit_menu)
+        edit_menu.add_command(label="Bulk Transform...", command=self.open_transform_dialog)
         edit_menu.add_command(label="Settings", command=self.open_settings_window)
 
     def open_settings_window(self):
+        from settings_window import SettingsWindow
         SettingsWindow(self, self.settings, self.on_settings_saved)
 
     def on_settings_saved(self, new_settings):
         old_theme = self.settings.get("theme")
         new_theme = new_settings.get("theme")
+        old_hotkey_backend = self.settings.get("hotkey_backend", "pynput")
 
         self.settings = new_settings
         self.settings_manager.save_settings(self.settings)
-        self.hotkey_listener.update_hotkeys(self.settings.get("hotkeys", {})) # COMMENTED OUT FOR DEBUGGING
+        if self.hotkey_listener:
+            if self.settings.get("hotkey_backend", "pynput") != old_hotkey_backend:
+                self.hotkey_listener.stop()
+                self.hotkey_listener = self.setup_hotkey_listener()
+                self.hotkey_listener.start()
+            else:
+                self.hotkey_listener.update_hotkeys(self.settings.get("hotkeys", {}))
         
         self.status_bar.config(text="Status: Settings saved.")
 
@@ -159,17 +214,20 @@ class AutoClickerGUI(ttk.Window):
         self.replay_check = ttk.Checkbutton(options_frame, text="Replay Indefinitely", variable=self.replay_var)
         self.replay_check.grid(row=2, column=2, columnspan=2, pady=(10, 0), sticky="w")
 
+        self.rate_mode_button = ttk.Button(options_frame, text="Click Rate Mode...", command=self.start_rate_mode, bootstyle=(INFO, OUTLINE))
+        self.rate_mode_button.grid(row=3, column=0, columnspan=4, pady=(10, 0), sticky="ew")
+
 
 
         # --- Action List ---
         list_frame = ttk.Frame(self, padding="10")
         list_frame.pack(fill=BOTH, expand=True)
-        self.action_listbox = tk.Listbox(list_frame, selectmode=SINGLE)
-        self.action_listbox.bind("<Double-1>", self.open_event_editor)
-        self.action_listbox.pack(side=LEFT, fill=BOTH, expand=True)
-        scrollbar = ttk.Scrollbar(list_frame, orient=VERTICAL, command=self.action_listbox.yview, bootstyle="round")
-        scrollbar.pack(side=RIGHT, fill=Y)
-        self.action_listbox.config(yscrollcommand=scrollbar.set)
+        # Only the visible rows are formatted and rendered, so huge macros stay responsive
+        from virtual_list import VirtualEventList
+        self.action_list = VirtualEventList(list_frame, get_events=lambda: self.recorded_events,
+                                            formatter=self._format_event_for_display,
+                                            on_activate=lambda index: self.open_event_editor())
+        self.action_list.pack(fill=BOTH, expand=True)
 
         # --- Edit & Add Frame ---
         edit_add_frame = ttk.Labelframe(self, text="Edit Macro", padding=(10)) # Fixed LabelFrame here
@@ -184,122 +242,387 @@ class AutoClickerGUI(ttk.Window):
         # --- Status Bar ---
         self.status_bar = ttk.Label(self, text="Status: Ready", relief=SUNKEN, anchor=W)
         self.status_bar.pack(side=BOTTOM, fill=X)
+
+        # --- Load/Save Progress (shown only while a file operation runs) ---
+        self.io_frame = ttk.Frame(self, padding=(10, 0, 10, 5))
+        self.io_label = ttk.Label(self.io_frame, text="")
+        self.io_label.pack(side=LEFT, padx=(0, 5))
+        self.io_progress = ttk.Progressbar(self.io_frame, maximum=1.0, mode="determinate")
+        self.io_progress.pack(side=LEFT, fill=X, expand=True, padx=5)
+        self.io_cancel_button = ttk.Button(self.io_frame, text="Cancel", command=self.cancel_io_task, bootstyle=(DANGER, OUTLINE))
+        self.io_cancel_button.pack(side=LEFT)
     
     def _get_selected_index(self):
-        indices = self.action_listbox.curselection()
+        indices = self.action_list.curselection()
         return indices[0] if indices else None
 
+    def _materialize_events(self):
+        """Turns a lazily opened journal or binary macro into an editable EventStore before the first edit."""
+        if not isinstance(self.recorded_events, EventStore):
+            self._replace_events(EventStore(self.recorded_events))
+
+    def _replace_events(self, events):
+        """Makes `events` the current macro and closes the previous one if it holds a file open (BinaryMacro)."""
+        previous, self.recorded_events = self.recorded_events, events
+        self._close_events(previous)
+
+    def _close_events(self, events):
+        close = getattr(events, 'close', None)
+        if close is None or events is self.recorded_events:
+            return
+        # A running playback or save may still read it; then it is left to the garbage collector
+        if self.player_thread and self.player_thread.is_alive() and getattr(self.player, 'events', None) is events:
+            return
+        if self._io_cancel is not None:
+            return
+        close()
+
     def _insert_event_at_selection(self, event): # Added/Re-added
+        self._materialize_events()
         index = self._get_selected_index()
         if index is None:
             self.recorded_events.append(event)
-            self.action_listbox.insert(END, self._format_event_for_display(event))
+            index = len(self.recorded_events) - 1
         else:
             self.recorded_events.insert(index, event)
-            self.action_listbox.insert(index, self._format_event_for_display(event))
+        self.plan_cache.invalidate()
+        self.action_list.refresh()
+        self.action_list.see(index)
         
         if self.recorded_events:
             self.play_button.config(state=NORMAL)
         self.status_bar.config(text=f"Status: Added new {event['type']} event.")
 
     def add_click_event(self): # Added/Re-added
+        from add_event_dialog import AddEventDialog
         dialog = AddEventDialog(self, title="Add Click Event", event_type='click')
         if dialog.result:
             self._insert_event_at_selection(dialog.result)
 
     def add_key_event(self): # Added/Re-added
+        from add_event_dialog import AddEventDialog
         dialog = AddEventDialog(self, title="Add Key Press Event", event_type='key_press')
         if dialog.result:
             self._insert_event_at_selection(dialog.result)
 
     def open_event_editor(self, _=None):
-        selected_indices = self.action_listbox.curselection()
+        selected_indices = self.action_list.curselection()
         if not selected_indices:
             return
         index = selected_indices[0]
         event_data = self.recorded_events[index]
+        from edit_window import EditEventWindow
         EditEventWindow(self, event_data, index, self.on_event_saved)
 
     def on_event_saved(self, index, updated_event):
+        self._materialize_events()
         self.recorded_events[index] = updated_event
-        self.action_listbox.delete(index)
-        self.action_listbox.insert(index, self._format_event_for_display(updated_event))
+        self.plan_cache.invalidate()
+        self.action_list.refresh(keep_selection=True)
         self.status_bar.config(text=f"Status: Event #{index + 1} updated.")
 
     def delete_selected_action(self):
-        selected_indices = self.action_listbox.curselection()
+        selected_indices = self.action_list.curselection()
         if not selected_indices:
             messagebox.showinfo("Info", "No action selected to delete.")
             return
-        for index in reversed(selected_indices):
-            self.action_listbox.delete(index)
-            del self.recorded_events[index]
-        self.status_bar.config(text=f"Status: Deleted action(s).")
+        self._materialize_events()
+        from macro_transforms import delete_events
+        delete_events(self.recorded_events, selected_indices)
+        self.plan_cache.invalidate()
+        self.action_list.refresh()
+        self.status_bar.config(text=f"Status: Deleted {len(selected_indices)} action(s).")
         if not self.recorded_events:
             self.play_button.config(state=DISABLED)
 
+    def open_transform_dialog(self):
+        if not self.recorded_events:
+            messagebox.showinfo("Info", "No events to transform.")
+            return
+        selected = self.action_list.curselection()
+        from transform_dialog import TransformDialog
+        dialog = TransformDialog(self, selected_count=len(selected))
+        if not dialog.result:
+            return
+        config = dialog.result
+
+        import time
+        import macro_transforms as mt
+        self._materialize_events()
+        store = self.recorded_events
+        start_time = time.perf_counter()
+        if config['scope'] == 'selection':
+            indices = mt.select(store, selected[0], selected[-1] + 1, config['types'], config['keys'], config['region'])
+            if len(selected) != selected[-1] + 1 - selected[0]:
+                # Not one contiguous range (ctrl-click): keep only the selected rows
+                chosen = set(selected)
+                indices = [i for i in indices if i in chosen]
+        else:
+            indices = mt.select(store, 0, None, config['types'], config['keys'], config['region'])
+
+        if config['delete']:
+            mt.delete_events(store, indices)
+            summary = f"Deleted {len(indices)} events"
+        else:
+            if config['delay_scale'] != 1.0:
+                mt.scale_delays(store, config['delay_scale'], indices)
+            if config['min_delay'] is not None or config['max_delay'] is not None:
+                mt.clamp_delays(store, config['min_delay'], config['max_delay'], indices)
+            if (config['scale_x'], config['scale_y'], config['shift_x'], config['shift_y']) != (1.0, 1.0, 0, 0):
+                mt.transform_coords(store, config['scale_x'], config['scale_y'],
+                                    config['shift_x'], config['shift_y'], indices)
+            if config['jitter_delay'] or config['jitter_position']:
+                mt.add_jitter(store, config['jitter_delay'], config['jitter_position'], config['seed'], indices)
+            summary = f"Transformed {len(indices)} events"
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        self.plan_cache.invalidate()
+        self.action_list.refresh()
+        self.play_button.config(state=NORMAL if self.recorded_events else DISABLED)
+        self.status_bar.config(text=f"Status: {summary} in {elapsed_ms:.1f} ms")
+
+    def _run_io_task(self, text, work, on_done):
+        """
+        Runs work(cancel_event, on_progress) on a worker thread with the
+        progress bar shown, then calls on_done(result, error) on the Tk thread.
+        """
+        cancel_event = threading.Event()
+        self._io_cancel = cancel_event
+        self.io_label.config(text=text)
+        self.io_progress['value'] = 0
+        self.io_cancel_button.config(state=NORMAL)
+        self.io_frame.pack(side=BOTTOM, fill=X, after=self.status_bar)
+        self.record_button.config(state=DISABLED)
+        self.play_button.config(state=DISABLED)
+
+        def run():
+            result, error = None, None
+            try:
+                result = work(cancel_event, lambda fraction: self.after(0, self._set_io_progress, fraction))
+            except Exception as e:
+                error = e
+            self.after(0, self._finish_io_task, on_done, result, error)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _set_io_progress(self, fraction):
+        self.io_progress['value'] = fraction
+
+    def _finish_io_task(self, on_done, result, error):
+        self._io_cancel = None
+        self.io_frame.pack_forget()
+        self.record_button.config(state=NORMAL)
+        self.play_button.config(state=NORMAL if self.recorded_events else DISABLED)
+        on_done(result, error)
+
+    def cancel_io_task(self):
+        if self._io_cancel is not None:
+            self._io_cancel.set()
+            self.io_label.config(text="Cancelling...")
+            self.io_cancel_button.config(state=DISABLED)
+
+    def _io_busy(self):
+        if self._io_cancel is not None:
+            messagebox.showinfo("Info", "A macro is still being loaded or saved.")
+            return True
+        return False
+
     def save_macro(self):
         if not self.recorded_events:
             messagebox.showwarning("Warning", "Nothing to save.")
             return
+        if self._io_busy(): return
         filepath = filedialog.asksaveasfilename(
-            defaultextension=".json", filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")])
+            defaultextension=".json",
+            filetypes=[("JSON Files", "*.json"), ("Binary Macros", "*.acm"), ("All Files", "*.*")])
         if not filepath: return
-        with open(filepath, 'w') as f:
-            json.dump(self.recorded_events, f, indent=4)
-        self.status_bar.config(text=f"Status: Macro saved to {filepath}")
+
+        # Save a snapshot so edits made while the worker runs cannot tear the file
+        events = self.recorded_events
+        if isinstance(events, EventStore):
+            events = events.copy()
+        elif isinstance(events, deque):
+            events = list(events)
+
+        def on_done(saved, error):
+            if error is not None:
+                messagebox.showerror("Error", f"Failed to save macro: {error}")
+                self.status_bar.config(text="Status: Error saving macro")
+            elif saved:
+                self.status_bar.config(text=f"Status: Macro saved to {filepath}")
+            else:
+                self.status_bar.config(text="Status: Save cancelled, existing file left unchanged")
+
+        from macro_io import save_events
+        self._run_io_task(f"Saving {len(events)} events...",
+                          lambda cancel_event, on_progress: save_events(events, filepath, cancel_event, on_progress),
+                          on_done)
 
     def load_macro(self):
-        filepath = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json"), ("All Files", "*.*")])
+        if self._io_busy(): return
+        filepath = filedialog.askopenfilename(
+            filetypes=[("Macros", "*.json *.acm"), ("JSON Files", "*.json"), ("Binary Macros", "*.acm"), ("All Files", "*.*")])
         if not filepath: return
+        if filepath.endswith(".acm") or filepath.endswith(".jsonl"):
+            try:
+                # Binary macros open memory-mapped and are only decoded as rows are shown
+                from macro_format import load_events
+                self._replace_events(load_events(filepath))
+                self.plan_cache.invalidate()
+                self.action_list.refresh()
+                self.play_button.config(state=NORMAL if self.recorded_events else DISABLED)
+                self.status_bar.config(text=f"Status: Macro loaded from {filepath}")
+            except (OSError, ValueError) as e:
+                messagebox.showerror("Error", f"Failed to load macro: {e}")
+                self.status_bar.config(text="Status: Error loading macro")
+            return
+
+        # JSON is parsed incrementally on a worker thread; rows appear batch by batch
+        previous = self.recorded_events
+        store = EventStore()
+        self.recorded_events = store
+        self.plan_cache.invalidate()
+        self.action_list.refresh()
+
+        def on_batch(batch, fraction):
+            store.extend(batch)
+            self.plan_cache.invalidate()
+            self.action_list.refresh(keep_selection=True)
+            self.io_progress['value'] = fraction
+
+        def on_done(count, error):
+            if error is not None or count is None:
+                # Cancelled or failed: put the previous macro back
+                if self.recorded_events is store:
+                    self.recorded_events = previous
+                self.plan_cache.invalidate()
+                self.action_list.refresh()
+                self.play_button.config(state=NORMAL if self.recorded_events else DISABLED)
+                if error is not None:
+                    messagebox.showerror("Error", f"Failed to load macro: {error}")
+                    self.status_bar.config(text="Status: Error loading macro")
+                else:
+                    self.status_bar.config(text="Status: Load cancelled")
+            else:
+                self._close_events(previous)
+                self.status_bar.config(text=f"Status: Macro loaded from {filepath} ({count} events)")
+
+        def on_info(info):
+            store.relative = bool(info.get('relative', False))
+
+        from macro_io import load_json_events
+        self._run_io_task("Loading...",
+                          lambda cancel_event, on_progress: load_json_events(
+                              filepath, lambda batch, fraction: self.after(0, on_batch, batch, fraction), cancel_event,
+                              on_info=lambda info: self.after(0, on_info, info)),
+                          on_done)
+
+    def open_journal(self):
+        filepath = filedialog.askopenfilename(filetypes=[("Recording Journals", "*.jsonl"), ("All Files", "*.*")])
+        if not filepath: return
+        from journal import JournalEvents
         try:
-            with open(filepath, 'r') as f:
-                loaded_events = json.load(f)
-            if not isinstance(loaded_events, list):
-                raise TypeError("JSON file does not contain a list of events.")
-            self.recorded_events = loaded_events
-            self.action_listbox.delete(0, END)
-            for event in self.recorded_events:
-                self.action_listbox.insert(END, self._format_event_for_display(event))
-            self.play_button.config(state=NORMAL if self.recorded_events else DISABLED)
-            self.status_bar.config(text=f"Status: Macro loaded from {filepath}")
-        except (json.JSONDecodeError, FileNotFoundError, TypeError) as e:
-            messagebox.showerror("Error", f"Failed to load macro: {e}")
-            self.status_bar.config(text="Status: Error loading macro")
+            # Read-only: a torn last line left by a crash is skipped, not cut off the file
+            self._replace_events(JournalEvents(filepath))
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to open journal: {e}")
+            return
+        self.plan_cache.invalidate()
+        self.action_list.refresh()
+        self.play_button.config(state=NORMAL if self.recorded_events else DISABLED)
+        self.status_bar.config(text=f"Status: Opened journal {filepath} ({len(self.recorded_events)} events)")
 
     def handle_action(self, event):
-        self.after(0, self.add_action_to_gui, event)
-
-    def add_action_to_gui(self, event):
-        self.recorded_events.append(event)
-        self.action_listbox.insert(END, self._format_event_for_display(event))
+        # Called from the recorder thread. deque.append is atomic, so this
+        # never blocks on (or wakes) the Tk loop; _drain_actions picks it up.
+        self.pending_actions.append(event)
+
+    def _drain_actions(self):
+        """Moves every queued recorded event into the list and redraws it once."""
+        pending = self.pending_actions
+        depth = len(pending)
+        if depth:
+            self.recorded_events.extend(pending.popleft() for _ in range(depth))
+            self._recorded_count += depth
+            self.plan_cache.invalidate()
+            self.action_list.refresh()
+            self.action_list.see(END)
+        return depth
+
+    def _drain_tick(self):
+        depth = self._drain_actions()
+        if self.recorder is None:
+            self._drain_job = None
+            return
+        self.status_bar.config(text=f"Status: Recording... {self._recorded_count} events, queue depth {depth}")
+        self._drain_job = self.after(DRAIN_INTERVAL_MS, self._drain_tick)
     
     def _format_event_for_display(self, event):
         event_str = f"Type: {event.get('type', 'N/A')}, Delay: {event.get('time', 0):.2f}s"
-        if event.get('type') == 'click':
+        if event.get('type') in ('click', 'button_down', 'button_up'):
             event_str += f", Pos: ({event.get('x', 0)}, {event.get('y', 0)}), Button: {event.get('button', 'N/A')}"
         elif event.get('type') == 'key_press':
             event_str += f", Key: {event.get('key', 'N/A')}"
+        elif event.get('type') == 'move':
+            path = event.get('path') or [[0, 0, 0]]
+            event_str += f", Path: {len(path)} points over {path[-1][0]:.2f}s to ({path[-1][1]}, {path[-1][2]})"
+        elif event.get('type') == 'scroll':
+            event_str += f", Pos: ({event.get('x', 0)}, {event.get('y', 0)}), Scroll: ({event.get('dx', 0)}, {event.get('dy', 0)})"
         return event_str
 
     def start_recording(self):
         if self.recorder is not None:
              print("Already recording.")
              return 
+        if self._io_busy(): return
         self.status_bar.config(text="Status: Recording...")
         self.record_button.config(state=DISABLED)
         self.stop_button.config(state=NORMAL)
         self.play_button.config(state=DISABLED)
-        self.action_listbox.delete(0, END)
-        self.recorded_events = []
-        self.recorder = Recorder(action_callback=self.handle_action)
+        relative_to = self._relative_window()
+        self._replace_events(EventStore())
+        self.recorded_events.relative = relative_to is not None
+        self._recorded_count = 0
+        self.pending_actions.clear()
+        self.plan_cache.invalidate()
+        journal_path = None
+        self._journaling = self.settings.get("journal_recording", False)
+        if self._journaling:
+            # The journal holds the session; the list only previews its tail
+            self.recorded_events = deque(maxlen=JOURNAL_PREVIEW_ROWS)
+            from journal import new_journal_path
+            journal_path = new_journal_path(self.settings.get("journal_dir", "recordings"))
+        options = dict(action_callback=self.handle_action,
+                       record_motion=self.settings.get("record_motion", False),
+                       simplify=self.settings.get("motion_simplify", "rdp"),
+                       epsilon=self.settings.get("motion_epsilon", 2.0),
+                       journal_path=journal_path,
+                       relative_to=relative_to)
+        self.recorder = None
+        if self.settings.get("recorder_backend", "pynput") == "xrecord":
+            try:
+                from xrecord_recorder import XRecordRecorder
+                self.recorder = XRecordRecorder(**options)
+            except Exception as e:
+                print(f"XRecord capture unavailable ({e}), falling back to pynput.")
+        if self.recorder is None:
+            from recorder import Recorder
+            self.recorder = Recorder(**options)
         self.recorder_thread = threading.Thread(target=self.recorder.start, daemon=True)
         self.recorder_thread.start()
+        if self._drain_job is None:
+            self._drain_job = self.after(DRAIN_INTERVAL_MS, self._drain_tick)
 
     def stop_recording(self):
         if self.recorder:
-            self.recorder.stop()
+            events = self.recorder.stop()
             self.recorder = None
+            # Pick up the final events flushed by stop() before the next tick would
+            self._drain_actions()
+            if self._journaling:
+                self.recorded_events = events
+                self._journaling = False
+                self.action_list.refresh()
             self.status_bar.config(text="Status: Stopped")
             self.record_button.config(state=NORMAL)
             self.stop_button.config(state=DISABLED)
@@ -334,13 +657,69 @@ class AutoClickerGUI(ttk.Window):
         print("safe_playback_complete called") # Diagnostic print
         self.after(0, self.on_playback_complete)
 
+    def safe_playback_progress(self, cycles, stats):
+        # Called from the player thread, at most once per second
+        text = f"Status: Playing... {cycles} cycles done, lateness mean {stats.mean_ms:.2f} ms"
+        self.after(0, lambda: self.status_bar.config(text=text))
+
+    def start_rate_mode(self):
+        if self.player_thread and self.player_thread.is_alive():
+            print("Already playing a macro.")
+            return
+
+        background = self.background_mode_var.get()
+        if background and not self.target_window:
+            messagebox.showerror("Error", "No target window selected for background mode.")
+            return
+
+        from rate_mode_dialog import RateModeDialog
+        from rate_clicker import RateClicker, create_click_target
+        dialog = RateModeDialog(self, background=background)
+        if not dialog.result:
+            return
+        config = dialog.result
+
+        try:
+            click_fn, flush_fn = create_click_target(
+                config['x'], config['y'], config['button'],
+                window=self.target_window if background else None,
+                backend=self.settings.get("playback_backend", "pynput"))
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to start rate mode: {e}")
+            return
+
+        self.status_bar.config(text=f"Status: Clicking at {config['cps']:g} clicks/s...")
+        self.play_button.config(state=DISABLED)
+        self.record_button.config(state=DISABLED)
+        self.stop_button.config(state=NORMAL, command=self.stop_playback)
+
+        self.player = RateClicker(click_fn, flush_fn, cps=config['cps'], burst=config['burst'],
+                                  duration=config['duration'], count=config['count'])
+        player = self.player
+        self.player_thread = threading.Thread(
+            target=self.player.play,
+            kwargs={"on_complete_callback": lambda: self.after(0, self.on_rate_mode_complete, player)},
+            daemon=True
+        )
+        self.player_thread.start()
+
+    def on_rate_mode_complete(self, player):
+        self.on_playback_complete()
+        self.status_bar.config(text=f"Status: Rate mode finished, {player.stats.summary()}")
+
     def play_macro(self):
         if self.player_thread and self.player_thread.is_alive():
             print("Already playing a macro.")
             return
+        if self._io_busy(): return # The F3 hotkey stays live while the Play button is disabled
         if not self.recorded_events:
             messagebox.showinfo("Info", "No macro to play.")
             return
+        # Whether positions are window-relative is stored with the macro, not taken from the settings
+        relative = getattr(self.recorded_events, 'relative', False)
+        if relative and not self.target_window:
+            messagebox.showerror("Error", "This macro was recorded relative to a window. Select a target window first.")
+            return
 
         if self.background_mode_var.get():
             if not self.target_window:
@@ -349,7 +728,7 @@ class AutoClickerGUI(ttk.Window):
             
             try:
                 if self.replay_var.get():
-                    repetitions = 999999 # A large number to simulate infinity
+                    repetitions = None # Loop until stopped
                 else:
                     repetitions = int(self.repeat_var.get())
                 speed = float(self.speed_var.get())
@@ -357,15 +736,35 @@ class AutoClickerGUI(ttk.Window):
                 messagebox.showerror("Error", "Invalid input for Repetitions or Speed.")
                 return
 
+            # Build the player before touching the buttons: it connects to X and can fail
+            hold = self.settings.get("background_hold_ms", 50) / 1000
+            fanout = len(self.target_windows) > 1
+            try:
+                if fanout:
+                    from fanout_player import FanoutPlayer
+                    self.player = FanoutPlayer(self.target_windows, self.recorded_events, plan_cache=self.plan_cache,
+                                               hold=hold, relative=relative)
+                else:
+                    from background_player import BackgroundPlayer
+                    self.player = BackgroundPlayer(self.target_window, self.recorded_events, plan_cache=self.plan_cache,
+                                                   hold=hold, relative=relative)
+            except Exception as e:
+                self.player = None
+                self.status_bar.config(text=f"Status: Background playback failed to start: {e}")
+                messagebox.showerror("Error", f"Failed to start background playback: {e}")
+                return
+
             self.status_bar.config(text="Status: Playing in background...")
             self.play_button.config(state=DISABLED)
             self.record_button.config(state=DISABLED)
             self.stop_button.config(state=NORMAL, command=self.stop_playback)
-
-            self.player = BackgroundPlayer(self.target_window, self.recorded_events)
+            if fanout:
+                from fanout_monitor import FanoutMonitor
+                FanoutMonitor(self, self.player, [self._window_name(w) for w in self.target_windows])
             self.player_thread = threading.Thread(
                 target=self.player.play,
-                kwargs={"repetitions": repetitions, "speed_multiplier": speed, "on_complete_callback": self.safe_playback_complete},
+                kwargs={"repetitions": repetitions, "speed_multiplier": speed, "on_complete_callback": self.safe_playback_complete,
+                        "on_progress": self.safe_playback_progress},
                 daemon=True
             )
             self.player_thread.start()
@@ -373,28 +772,37 @@ class AutoClickerGUI(ttk.Window):
         else:
             try:
                 if self.replay_var.get():
-                    repetitions = 999999 # A large number to simulate infinity
+                    repetitions = None # Loop until stopped
                 else:
                     repetitions = int(self.repeat_var.get())
                 speed = float(self.speed_var.get())
             except ValueError:
                 messagebox.showerror("Error", "Invalid input for Repetitions or Speed.")
                 return
+            try:
+                from player import Player
+                self.player = Player(self.recorded_events, plan_cache=self.plan_cache,
+                                     backend=self.settings.get("playback_backend", "pynput"),
+                                     relative_to=self.target_window if relative else None)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to start playback engine: {e}")
+                return
             self.status_bar.config(text="Status: Playing...")
             self.play_button.config(state=DISABLED)
             self.record_button.config(state=DISABLED)
             self.stop_button.config(state=NORMAL, command=self.stop_playback) # Added
-            self.player = Player(self.recorded_events)
             self.player_thread = threading.Thread(
                 target=self.player.play,
-                kwargs={"repetitions": repetitions, "speed_multiplier": speed, "on_complete_callback": self.safe_playback_complete},
+                kwargs={"repetitions": repetitions, "speed_multiplier": speed, "on_complete_callback": self.safe_playback_complete,
+                        "on_progress": self.safe_playback_progress},
                 daemon=True
             )
             self.player_thread.start()
 
 if __name__ == "__main__":
     print("Main app starting...") # Diagnostic print
-    app = AutoClickerGUI()
+    with trace.phase("build AutoClickerGUI"):
+        app = AutoClickerGUI()
     print("AutoClickerGUI initialized.") # Diagnostic print
     app.mainloop()
     print("Main app exiting.") # Diagnostic print
\ No newline at end of file
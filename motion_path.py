@@ -0,0 +1,137 @@
+from array import array
+
+class MotionRingBuffer:
+    """
+    Preallocated buffer of (t, x, y) mouse samples.
+
+    append() only writes into fixed arrays, so the pynput move callback
+    does no allocation and no GUI work per sample. It returns True once
+    the buffer is full, at which point the owner should drain() it.
+    """
+
+    def __init__(self, capacity=8192):
+        self.capacity = capacity
+        self._t = array('d', bytes(8 * capacity))
+        self._x = array('i', bytes(4 * capacity))
+        self._y = array('i', bytes(4 * capacity))
+        self._start = 0
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, t, x, y):
+        i = (self._start + self._count) % self.capacity
+        self._t[i] = t
+        self._x[i] = x
+        self._y[i] = y
+        if self._count < self.capacity:
+            self._count += 1
+        else:
+            # Full: overwrite the oldest sample
+            self._start = (self._start + 1) % self.capacity
+        return self._count == self.capacity
+
+    def last(self):
+        """Returns the newest (t, x, y) sample, or None if empty."""
+        if not self._count:
+            return None
+        i = (self._start + self._count - 1) % self.capacity
+        return (self._t[i], self._x[i], self._y[i])
+
+    def drain(self):
+        """Returns all samples, oldest first, as a list of (t, x, y) and empties the buffer."""
+        samples = []
+        for n in range(self._count):
+            i = (self._start + n) % self.capacity
+            samples.append((self._t[i], self._x[i], self._y[i]))
+        self._start = 0
+        self._count = 0
+        return samples
+
+
+def _point_line_distance_sq(px, py, ax, ay, bx, by):
+    dx = bx - ax
+    dy = by - ay
+    if dx == 0 and dy == 0:
+        return (px - ax) ** 2 + (py - ay) ** 2
+    cross = dx * (ay - py) - dy * (ax - px)
+    return cross * cross / (dx * dx + dy * dy)
+
+def simplify_rdp(points, epsilon=2.0):
+    """
+    Ramer-Douglas-Peucker simplification of (t, x, y) points in the x/y plane.
+    Keeps every point further than `epsilon` pixels from the simplified line.
+    """
+    if len(points) < 3 or epsilon <= 0:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    epsilon_sq = epsilon * epsilon
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        _, ax, ay = points[first]
+        _, bx, by = points[last]
+        max_dist = -1.0
+        index = first
+        for i in range(first + 1, last):
+            _, px, py = points[i]
+            dist = _point_line_distance_sq(px, py, ax, ay, bx, by)
+            if dist > max_dist:
+                max_dist = dist
+                index = i
+        if max_dist > epsilon_sq:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, k in zip(points, keep) if k]
+
+def decimate(points, min_interval=0.02, min_distance=3.0):
+    """Drops points closer than `min_interval` seconds or `min_distance` pixels to the last kept point."""
+    if len(points) < 3:
+        return list(points)
+    result = [points[0]]
+    min_distance_sq = min_distance * min_distance
+    for t, x, y in points[1:-1]:
+        lt, lx, ly = result[-1]
+        if t - lt >= min_interval or (x - lx) ** 2 + (y - ly) ** 2 >= min_distance_sq:
+            result.append((t, x, y))
+    result.append(points[-1])
+    return result
+
+def simplify_path(points, method="rdp", epsilon=2.0, min_interval=0.02):
+    """Simplifies a recorded path with the named method ("rdp", "decimate" or "none")."""
+    if method == "rdp":
+        return simplify_rdp(points, epsilon)
+    if method == "decimate":
+        return decimate(points, min_interval, epsilon)
+    return list(points)
+
+def interpolate_path(path, rate_hz=60.0):
+    """
+    Resamples a simplified path of [dt, x, y] vertices (dt in seconds from
+    the first vertex) at `rate_hz`, linearly between vertices. Returns a
+    list of (dt, x, y) that always ends on the last vertex.
+    """
+    if not path:
+        return []
+    if len(path) == 1 or rate_hz <= 0:
+        return [tuple(v) for v in path]
+
+    step = 1.0 / rate_hz
+    samples = [tuple(path[0])]
+    segment = 1
+    t = path[0][0] + step
+    end = path[-1][0]
+    while t < end:
+        while path[segment][0] < t:
+            segment += 1
+        t0, x0, y0 = path[segment - 1]
+        t1, x1, y1 = path[segment]
+        f = (t - t0) / (t1 - t0) if t1 > t0 else 1.0
+        samples.append((t, round(x0 + (x1 - x0) * f), round(y0 + (y1 - y0) * f)))
+        t += step
+    samples.append(tuple(path[-1]))
+    return samples
@@ -0,0 +1,154 @@
+from motion_path import interpolate_path
+from event_store import EventStore
+from macro_format import EV_CLICK, EV_KEY, EV_MOVE, EV_SCROLL, EV_BUTTON_DOWN, EV_BUTTON_UP
+
+# Opcodes
+OP_WAIT = 0   # Nothing to execute, only the delay (unknown or unsupported event)
+OP_CLICK = 1  # arg: resolved button, x/y: position
+OP_KEY = 2    # arg: resolved key
+OP_MOVE = 3   # x/y: pointer position
+OP_SCROLL = 4 # arg: (dx, dy), x/y: position
+OP_BUTTON_DOWN = 5 # arg: resolved button, x/y: position (drags)
+OP_BUTTON_UP = 6   # arg: resolved button, x/y: position
+
+# Rate at which recorded "move" paths are interpolated back on playback
+MOVE_RATE_HZ = 60.0
+
+class PlaybackPlan:
+    """
+    A macro compiled once into pre-resolved steps, so the playback loop only
+    waits and dispatches on an integer opcode on every repetition.
+    """
+
+    def __init__(self, steps, speed_multiplier):
+        # Each step is (delay_ns, opcode, arg, x, y)
+        self.steps = steps
+        self.speed_multiplier = speed_multiplier
+
+    def __len__(self):
+        return len(self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+
+def compile_plan(events, speed_multiplier, resolve_button, resolve_key, move_rate_hz=MOVE_RATE_HZ):
+    """
+    Builds a PlaybackPlan from recorded events.
+
+    :param resolve_button: Maps a button string (e.g. "Button.left") to the backend's button, or None.
+    :param resolve_key: Maps a key string (e.g. "a", "Key.enter") to the backend's key, or None.
+    :param move_rate_hz: Rate at which simplified "move" paths are replayed.
+    """
+    if speed_multiplier <= 0:
+        speed_multiplier = 1.0
+    scale = 1e9 / speed_multiplier
+    if isinstance(events, EventStore):
+        return _compile_store(events, speed_multiplier, scale, resolve_button, resolve_key, move_rate_hz)
+
+    button_cache = {}
+    key_cache = {}
+    steps = []
+    for event in events:
+        delay_ns = int(event.get('time', 0) * scale)
+        event_type = event.get('type')
+
+        if event_type in ('click', 'button_down', 'button_up'):
+            button_str = event.get('button', '')
+            if button_str not in button_cache:
+                button_cache[button_str] = resolve_button(button_str)
+            button = button_cache[button_str]
+            if button is not None:
+                opcode = OP_CLICK if event_type == 'click' else OP_BUTTON_DOWN if event_type == 'button_down' else OP_BUTTON_UP
+                steps.append((delay_ns, opcode, button, event['x'], event['y']))
+                continue
+
+        elif event_type == 'move':
+            if _append_path(steps, delay_ns, event.get('path', []), move_rate_hz / speed_multiplier, scale):
+                continue
+
+        elif event_type == 'scroll':
+            steps.append((delay_ns, OP_SCROLL, (event.get('dx', 0), event.get('dy', 0)), event['x'], event['y']))
+            continue
+
+        elif event_type == 'key_press':
+            key_str = event.get('key', '')
+            if key_str not in key_cache:
+                key_cache[key_str] = resolve_key(key_str)
+            key = key_cache[key_str]
+            if key is not None:
+                steps.append((delay_ns, OP_KEY, key, 0, 0))
+                continue
+
+        # Keep the timing of events the backend cannot execute
+        steps.append((delay_ns, OP_WAIT, None, 0, 0))
+
+    return PlaybackPlan(tuple(steps), speed_multiplier)
+
+_STORE_OPCODES = {EV_CLICK: OP_CLICK, EV_BUTTON_DOWN: OP_BUTTON_DOWN, EV_BUTTON_UP: OP_BUTTON_UP}
+
+def _append_path(steps, delay_ns, path, rate_hz, scale):
+    samples = interpolate_path(path, rate_hz)
+    if not samples:
+        return False
+    # Delays come from the cumulative path time, so rounding never adds up
+    previous_ns = 0
+    for dt, x, y in samples:
+        at_ns = int(dt * scale)
+        steps.append((delay_ns + at_ns - previous_ns, OP_MOVE, None, x, y))
+        previous_ns = at_ns
+        delay_ns = 0
+    return True
+
+def _compile_store(store, speed_multiplier, scale, resolve_button, resolve_key, move_rate_hz):
+    """compile_plan for an EventStore: walks the columns and resolves each interned string once."""
+    strings = store.strings
+    buttons = {} # string id -> resolved button
+    keys = {}
+    move_rate = move_rate_hz / speed_multiplier
+    steps = []
+    append = steps.append
+    for t, code, x, y, a, b in zip(store.times, store.types, store.xs, store.ys, store.a, store.b):
+        delay_ns = int(t * scale)
+        opcode = _STORE_OPCODES.get(code)
+        if opcode is not None:
+            if a not in buttons:
+                buttons[a] = resolve_button(strings[a])
+            if buttons[a] is not None:
+                append((delay_ns, opcode, buttons[a], x, y))
+                continue
+        elif code == EV_KEY:
+            if a not in keys:
+                keys[a] = resolve_key(strings[a])
+            if keys[a] is not None:
+                append((delay_ns, OP_KEY, keys[a], 0, 0))
+                continue
+        elif code == EV_MOVE:
+            if _append_path(steps, delay_ns, store.paths[a], move_rate, scale):
+                continue
+        elif code == EV_SCROLL:
+            append((delay_ns, OP_SCROLL, (a, b), x, y))
+            continue
+        append((delay_ns, OP_WAIT, None, 0, 0))
+    return PlaybackPlan(tuple(steps), speed_multiplier)
+
+
+class PlanCache:
+    """
+    Holds the compiled plans of one macro, keyed by backend and speed.
+
+    The owner of the macro calls invalidate() whenever it edits the events.
+    """
+
+    def __init__(self):
+        self._plans = {}
+
+    def get(self, key, compile_fn):
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = compile_fn()
+            self._plans[key] = plan
+        return plan
+
+    def invalidate(self):
+        self._plans.clear()
@@ -1,66 +1,180 @@
-from pynput import mouse, keyboard
 import time
 import threading
+from scheduler import FLUSH_GAP_NS, PlaybackScheduler
+from playback_plan import OP_BUTTON_DOWN, OP_BUTTON_UP, OP_CLICK, OP_KEY, OP_MOVE, OP_SCROLL, compile_plan
 
-class Player:
-    def __init__(self, events):
-        self.events = events
+class PynputBackend:
+    """Foreground input through pynput's mouse and keyboard controllers."""
+
+    name = "pynput"
+
+    def __init__(self):
+        # Imported here so XTest and headless playback never load pynput
+        from pynput import mouse, keyboard
+        self._Button = mouse.Button
+        self._Key = keyboard.Key
         self.mouse_controller = mouse.Controller()
         self.keyboard_controller = keyboard.Controller()
-        self.stop_requested = False
+
+    def resolve_button(self, button_str):
+        if 'left' in button_str:
+            return self._Button.left
+        elif 'right' in button_str:
+            return self._Button.right
+        elif 'middle' in button_str:
+            return self._Button.middle
+        return None
+
+    def resolve_key(self, key_str):
+        if key_str.startswith('Key.'):
+            key_name = key_str.split('.')[1]
+            if hasattr(self._Key, key_name):
+                return getattr(self._Key, key_name)
+        return key_str
+
+    def click(self, x, y, button):
+        self.mouse_controller.position = (x, y)
+        self.mouse_controller.click(button, 1)
+
+    def tap_key(self, key):
+        self.keyboard_controller.press(key)
+        self.keyboard_controller.release(key)
+
+    def move(self, x, y):
+        self.mouse_controller.position = (x, y)
+
+    def scroll(self, x, y, dx, dy):
+        self.mouse_controller.position = (x, y)
+        self.mouse_controller.scroll(dx, dy)
+
+    def press_button(self, x, y, button):
+        self.mouse_controller.position = (x, y)
+        self.mouse_controller.press(button)
+
+    def release_button(self, x, y, button):
+        self.mouse_controller.position = (x, y)
+        self.mouse_controller.release(button)
+
+    def flush(self):
+        pass # pynput sends every event immediately
+
+    def sync(self):
+        pass
+
+    def close(self):
+        pass
+
+def create_backend(name="pynput", display_name=None):
+    """
+    Creates a foreground playback backend by name ("pynput" or "xtest").
+    display_name only applies to XTest; pynput always uses $DISPLAY.
+    """
+    if name == "xtest":
+        from xtest_backend import XTestBackend
+        return XTestBackend(display_name)
+    return PynputBackend()
+
+class Player:
+    def __init__(self, events, plan_cache=None, backend="pynput", relative_to=None, display_name=None):
+        """
+        :param relative_to: Window (object or id) the macro's positions are
+                            relative to; they are moved along with it. None
+                            plays screen positions.
+        :param display_name: X display of `relative_to`. Defaults to $DISPLAY.
+        """
+        self.events = events
+        self.plan_cache = plan_cache # Optional PlanCache owned by the macro
+        self.backend = create_backend(backend) if isinstance(backend, str) else backend
+        self._stop_event = threading.Event()
+        self.stats = None # Lateness stats of the last playback
+        self.geometry = None
+        if relative_to is not None:
+            from x_connection import connections
+            from window_geometry import WindowGeometry
+            connection, self._release_geometry = connections.lease(self, display_name)
+            self.geometry = WindowGeometry(connection.display, relative_to)
+            connection.on_release.append(self.geometry.close)
+
+    @property
+    def stop_requested(self):
+        return self._stop_event.is_set()
 
     def stop(self):
         """Signals the player to stop playback."""
         print("Stop requested for player.")
-        self.stop_requested = True
+        self._stop_event.set()
 
-    def play(self, repetitions=1, speed_multiplier=1.0, on_complete_callback=None):
+    def play(self, repetitions=1, speed_multiplier=1.0, on_complete_callback=None,
+             duration=None, deadline=None, on_progress=None, progress_interval=1.0):
         """
         Plays the recorded events. This method is blocking but can be
         interrupted by calling the stop() method from another thread.
+
+        :param repetitions: Number of cycles, or None to loop until stopped.
+        :param duration: Optional wall-clock limit in seconds.
+        :param deadline: Optional time.time() value at which to stop.
+        :param on_progress: Optional callback(cycles_completed, stats), called
+                            at most once per `progress_interval` seconds.
         """
-        print(f"Starting playback... (Repetitions: {repetitions}, Speed: {speed_multiplier}x)")
-        self.stop_requested = False
+        print(f"Starting playback... (Repetitions: {repetitions or 'until stopped'}, Speed: {speed_multiplier}x)")
+        self._stop_event.clear()
 
         if speed_multiplier <= 0:
             print("Warning: Speed multiplier must be positive. Defaulting to 1.0x.")
             speed_multiplier = 1.0
 
-        for i in range(repetitions):
-            if self.stop_requested:
-                break
-            
-            print(f"Repetition {i + 1}/{repetitions}")
-            for event in self.events:
-                if self.stop_requested:
+        steps = self._get_plan(speed_multiplier).steps
+        backend = self.backend
+        click = backend.click
+        tap_key = backend.tap_key
+        move = backend.move
+        flush = backend.flush
+        geometry = self.geometry
+
+        scheduler = PlaybackScheduler(self._stop_event)
+        scheduler.start()
+        scheduler.limit(duration, deadline)
+        self.stats = scheduler.stats
+        wait_ns = scheduler.wait_ns
+
+        for _ in scheduler.cycles(repetitions, on_progress, progress_interval):
+            for delay_ns, opcode, arg, x, y in steps:
+                # Send what is queued before sleeping, batch it otherwise
+                if delay_ns >= FLUSH_GAP_NS:
+                    flush()
+                    if geometry is not None:
+                        geometry.poll()
+
+                # Sleep until the event's absolute deadline; wakes early on stop()
+                if not wait_ns(delay_ns):
                     break
 
-                # Custom sleep loop to allow for interruption
-                delay = event['time'] / speed_multiplier
-                end_time = time.time() + delay
-                while time.time() < end_time:
-                    if self.stop_requested:
-                        break
-                    time.sleep(0.01)  # Check for stop signal every 10ms
-
-                if self.stop_requested:
-                    break
+                if geometry is not None and opcode != OP_KEY:
+                    x, y = geometry.to_screen(x, y) # Cached origin, no round trip
 
                 # Execute the event
-                if event['type'] == 'click':
-                    self.mouse_controller.position = (event['x'], event['y'])
-                    button = self._get_button(event['button'])
-                    if button:
-                        self.mouse_controller.click(button, 1)
-
-                elif event['type'] == 'key_press':
-                    key_to_press = self._get_key(event['key'])
-                    self.keyboard_controller.press(key_to_press)
-                    self.keyboard_controller.release(key_to_press)
-            
-            if self.stop_requested:
-                break
+                if opcode == OP_MOVE:
+                    move(x, y)
+
+                elif opcode == OP_CLICK:
+                    click(x, y, arg)
+
+                elif opcode == OP_KEY:
+                    tap_key(arg)
+
+                elif opcode == OP_SCROLL:
+                    backend.scroll(x, y, arg[0], arg[1])
 
+                elif opcode == OP_BUTTON_DOWN:
+                    backend.press_button(x, y, arg)
+
+                elif opcode == OP_BUTTON_UP:
+                    backend.release_button(x, y, arg)
+
+        # Make sure the server has processed everything before reporting completion
+        backend.sync()
+
+        print(f"Played {scheduler.cycles_completed} cycles. Timing: {self.stats.summary()}")
         if self.stop_requested:
             print("Playback stopped by user.")
         else:
@@ -68,21 +182,14 @@ class Player:
             if on_complete_callback:
                 on_complete_callback()
     
-    def _get_button(self, button_str):
-        if 'left' in button_str:
-            return mouse.Button.left
-        elif 'right' in button_str:
-            return mouse.Button.right
-        elif 'middle' in button_str:
-            return mouse.Button.middle
-        return None
-
-    def _get_key(self, key_str):
-        if key_str.startswith('Key.'):
-            key_name = key_str.split('.')[1]
-            if hasattr(keyboard.Key, key_name):
-                return getattr(keyboard.Key, key_name)
-        return key_str
+    def compile(self, speed_multiplier=1.0):
+        """Resolves the events into a PlaybackPlan for the player's backend."""
+        return compile_plan(self.events, speed_multiplier, self.backend.resolve_button, self.backend.resolve_key)
+
+    def _get_plan(self, speed_multiplier):
+        if self.plan_cache is None:
+            return self.compile(speed_multiplier)
+        return self.plan_cache.get((self.backend.name, speed_multiplier), lambda: self.compile(speed_multiplier))
 
 
 if __name__ == '__main__':
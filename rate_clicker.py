@@ -0,0 +1,164 @@
+import math
+import threading
+import time
+
+CATCH_UP = 0.1 # Seconds of missed clicks the clicker may still make up
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens per second, holding at most
+    `capacity` tokens. When the consumer falls behind (a late wake-up, a
+    slow click) the saved-up tokens let it catch up in a burst, so the
+    long-run rate stays on target instead of losing every late slot.
+    """
+
+    def __init__(self, rate, capacity=1, stop_event=None):
+        if rate <= 0:
+            raise ValueError("Rate must be positive.")
+        self.rate = rate
+        self.capacity = max(1, int(capacity))
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self._tokens = 0.0
+        self._last_ns = time.perf_counter_ns()
+
+    def _refill(self):
+        now = time.perf_counter_ns()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_ns) * self.rate / 1e9)
+        self._last_ns = now
+
+    def available(self):
+        """Returns the number of whole tokens that can be taken right now."""
+        self._refill()
+        return int(self._tokens)
+
+    def take(self, count=1):
+        """Blocks until `count` tokens are available and takes them. Returns False if stopped."""
+        self._refill()
+        while self._tokens < count:
+            if self.stop_event.wait((count - self._tokens) / self.rate):
+                return False
+            self._refill()
+        self._tokens -= count
+        return not self.stop_event.is_set()
+
+
+class RateStats:
+    def __init__(self):
+        self.clicks = 0
+        self.elapsed = 0.0
+
+    @property
+    def achieved_cps(self):
+        return self.clicks / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self):
+        return f"{self.clicks} clicks in {self.elapsed:.2f} s ({self.achieved_cps:.1f} clicks/s)"
+
+
+class RateClicker:
+    """
+    Clicks at a fixed target rate until the duration or click count is
+    reached, or stop() is called. Up to `burst` clicks may be issued back
+    to back (and flushed together) when catching up.
+
+    The bucket holds `catch_up` seconds worth of clicks, independently of
+    `burst`: every wake-up overshoots a little, and with room for only one
+    token that time would be lost for good, so high rates fell short.
+    """
+
+    def __init__(self, click_fn, flush_fn=None, cps=10.0, burst=1, duration=None, count=None, catch_up=CATCH_UP):
+        self.click_fn = click_fn
+        self.flush_fn = flush_fn
+        self.cps = cps
+        self.burst = max(1, int(burst))
+        self.catch_up = catch_up
+        self.duration = duration # Seconds, None or 0 for no limit
+        self.count = count # Clicks, None or 0 for no limit
+        self._stop_event = threading.Event()
+        self.stats = RateStats()
+
+    @property
+    def stop_requested(self):
+        return self._stop_event.is_set()
+
+    def stop(self):
+        """Signals the clicker to stop."""
+        self._stop_event.set()
+
+    def play(self, on_complete_callback=None):
+        print(f"Starting rate mode... (Target: {self.cps} clicks/s, Burst: {self.burst})")
+        self._stop_event.clear()
+        self.stats = RateStats()
+        capacity = max(self.burst, math.ceil(self.cps * self.catch_up))
+        bucket = TokenBucket(self.cps, capacity, self._stop_event)
+        click = self.click_fn
+        flush = self.flush_fn
+
+        start = time.perf_counter()
+        deadline = start + self.duration if self.duration else None
+        remaining = self.count if self.count else None
+        clicks = 0
+
+        while bucket.take():
+            # Tokens saved up beyond this one go out in the same flush, up to `burst`
+            n = min(1 + bucket.available(), self.burst)
+            if remaining is not None:
+                n = min(n, remaining)
+            if n > 1:
+                bucket.take(n - 1)
+            for _ in range(n):
+                click()
+            if flush:
+                flush()
+            clicks += n
+            self.stats.clicks = clicks
+            self.stats.elapsed = time.perf_counter() - start
+
+            if remaining is not None:
+                remaining -= n
+                if remaining <= 0:
+                    break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+        self.stats.elapsed = time.perf_counter() - start
+        print(f"Rate mode: {self.stats.summary()}")
+        if on_complete_callback:
+            on_complete_callback()
+
+
+def create_click_target(x, y, button_str, window=None, backend="pynput"):
+    """
+    Returns (click_fn, flush_fn) that click `button_str` at (x, y).
+    With a window the clicks are sent to it in the background, otherwise
+    the named foreground backend is used.
+    """
+    if window is not None:
+        from background_player import BackgroundPlayer
+        player = BackgroundPlayer(window, [], hold=0)
+        button_code = player._get_button_code(button_str)
+        if not button_code:
+            raise ValueError(f"Unknown button: {button_str}")
+        return (lambda: player.send_button(x, y, button_code, flush=False)), player.display.flush
+
+    from player import create_backend
+    foreground = create_backend(backend)
+    button = foreground.resolve_button(button_str)
+    if button is None:
+        raise ValueError(f"Unknown button: {button_str}")
+    return (lambda: foreground.click(x, y, button)), foreground.flush
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Check that the achieved rate stays within 2% of the target, without touching the mouse
+    failed = False
+    for cps in (100, 500, 1000, 2000):
+        for burst in (1, 5):
+            clicker = RateClicker(lambda: None, cps=cps, burst=burst, duration=2)
+            clicker.play()
+            error = abs(clicker.stats.achieved_cps - cps) / cps
+            print(f"{cps} clicks/s, burst {burst}: {clicker.stats.achieved_cps:.1f} ({error:.1%} off)")
+            failed = failed or error > 0.02
+    sys.exit(1 if failed else 0)
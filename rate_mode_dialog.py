@@ -0,0 +1,87 @@
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from tkinter import messagebox
+
+class RateModeDialog(ttk.Toplevel):
+    def __init__(self, parent, background=False):
+        super().__init__(parent)
+        self.title("Click Rate Mode")
+        self.transient(parent)
+        self.wait_visibility() # Ensure the window is fully mapped before grabbing
+        self.grab_set()
+
+        self.background = background
+        self.entries = {}
+        self.result = None
+
+        master_frame = ttk.Frame(self, padding=15)
+        master_frame.pack(fill=BOTH, expand=True)
+
+        self.body(master_frame)
+        self.buttonbox(master_frame)
+
+        self.wait_window()
+
+    def body(self, master):
+        fields = [
+            ("CPS", "Clicks per second", "20"),
+            ("Burst", "Burst size", "1"),
+            ("Duration", "Duration (s, 0 = no limit)", "10"),
+            ("Count", "Click count (0 = no limit)", "0"),
+            ("X", "X", "100"),
+            ("Y", "Y", "100"),
+            ("Button", "Button", "Button.left"),
+        ]
+
+        for i, (key, label, default_val) in enumerate(fields):
+            ttk.Label(master, text=f"{label}:").grid(row=i, column=0, sticky="w", padx=5, pady=5)
+            entry = ttk.Entry(master)
+            entry.grid(row=i, column=1, sticky="ew", padx=5, pady=5)
+            entry.insert(0, default_val)
+            self.entries[key.lower()] = entry
+
+        target = "target window (background)" if self.background else "screen (foreground)"
+        ttk.Label(master, text=f"Clicks go to the {target}.").grid(row=len(fields), column=0, columnspan=2, sticky="w", padx=5, pady=(5, 0))
+        master.columnconfigure(1, weight=1)
+
+    def buttonbox(self, master):
+        button_frame = ttk.Frame(master, padding=(0, 10, 0, 0))
+        button_frame.grid(row=len(self.entries) + 1, column=0, columnspan=2, sticky="e")
+
+        ok_button = ttk.Button(button_frame, text="Start", command=self.handle_ok, bootstyle=SUCCESS)
+        ok_button.pack(side=LEFT, padx=5)
+        cancel_button = ttk.Button(button_frame, text="Cancel", command=self.handle_cancel, bootstyle=DANGER)
+        cancel_button.pack(side=LEFT)
+
+    def handle_ok(self, event=None):
+        if not self.validate():
+            return
+        self.apply()
+        self.destroy()
+
+    def handle_cancel(self, event=None):
+        self.destroy()
+
+    def validate(self):
+        try:
+            if float(self.entries['cps'].get()) <= 0 or int(self.entries['burst'].get()) < 1:
+                raise ValueError
+            if float(self.entries['duration'].get()) < 0 or int(self.entries['count'].get()) < 0:
+                raise ValueError
+            int(self.entries['x'].get())
+            int(self.entries['y'].get())
+            return True
+        except ValueError:
+            messagebox.showwarning("Bad input", "Please check your input values (rate and burst must be positive, coordinates must be numbers).", parent=self)
+            return False
+
+    def apply(self):
+        self.result = {
+            'cps': float(self.entries['cps'].get()),
+            'burst': int(self.entries['burst'].get()),
+            'duration': float(self.entries['duration'].get()),
+            'count': int(self.entries['count'].get()),
+            'x': int(self.entries['x'].get()),
+            'y': int(self.entries['y'].get()),
+            'button': self.entries['button'].get(),
+        }
@@ -1,69 +1,218 @@
 import time
-from pynput import mouse, keyboard
+import threading
+from motion_path import MotionRingBuffer, simplify_path
+from journal import RecordingJournal, JournalEvents
+from event_store import EventStore
 
 class Recorder:
-    def __init__(self, action_callback):
+    def __init__(self, action_callback, record_motion=False, simplify="rdp", epsilon=2.0, journal_path=None,
+                 relative_to=None, display_name=None):
+        """
+        :param record_motion: Also capture mouse movement, scrolling and drags.
+                              Moves are buffered and emitted as one simplified
+                              "move" event when another event arrives.
+        :param simplify: Path simplification, "rdp", "decimate" or "none".
+        :param epsilon: Tolerance in pixels for the simplification.
+        :param journal_path: If set, events are appended to this journal file
+                             instead of being kept in memory, and stop()
+                             returns a lazy JournalEvents view of it.
+        :param relative_to: Window (object or id) whose top-left corner is the
+                            origin of recorded positions. None records screen
+                            positions.
+        :param display_name: X display of the `relative_to` window; None for $DISPLAY.
+        """
         self.action_callback = action_callback
-        self._events = []
+        self.display_name = display_name
+        self._events = EventStore()
         self._running = False
         self._start_time = None
+        self.journal_path = journal_path
+        self._journal = None
 
-        self.mouse_listener = mouse.Listener(
-            on_click=self.on_click
-        )
+        self.record_motion = record_motion
+        self.simplify = simplify
+        self.epsilon = epsilon
+        self._motion = MotionRingBuffer()
+        self._pending_press = None # (time, x, y, button) until we know if it is a click or a drag
+        self._lock = threading.Lock() # Mouse and keyboard callbacks arrive on different threads
+        self._geometry = None
+        if relative_to is not None:
+            from x_connection import connections
+            from window_geometry import WindowGeometry
+            self._geometry_connection = connections.acquire(display_name)
+            self._geometry = WindowGeometry(self._geometry_connection.display, relative_to)
+            self._geometry_connection.on_release.append(self._geometry.close)
+        try:
+            self._create_listeners()
+        except Exception:
+            self._release_geometry()
+            raise
+
+    def _create_listeners(self):
+        from pynput import mouse, keyboard
+        if self.record_motion:
+            self.mouse_listener = mouse.Listener(
+                on_click=self.on_click,
+                on_move=self.on_move,
+                on_scroll=self.on_scroll
+            )
+        else:
+            self.mouse_listener = mouse.Listener(
+                on_click=self.on_click
+            )
         self.keyboard_listener = keyboard.Listener(
             on_press=self.on_press
         )
 
     def start(self):
-        self._events = []
+        self._events = EventStore()
+        self._events.relative = self._geometry is not None
+        if self.journal_path:
+            self._journal = RecordingJournal(self.journal_path, relative=self._geometry is not None)
         self._running = True
         self._start_time = time.time()
+        self._start_capture()
+
+    def _start_capture(self):
         self.mouse_listener.start()
         self.keyboard_listener.start()
 
+    def _stop_capture(self):
+        self.mouse_listener.stop()
+        self.keyboard_listener.stop()
+
+    def _release_geometry(self):
+        if self._geometry is not None:
+            from x_connection import connections
+            connections.release(self._geometry_connection)
+            self._geometry = None
+
     def stop(self):
         if self._running:
+            self._stop_capture()
+            with self._lock:
+                self._flush_pending(final=True)
             self._running = False
-            self.mouse_listener.stop()
-            self.keyboard_listener.stop()
+            self._release_geometry()
             # The listeners need to be joined by the thread that started them.
             # We will handle the thread management in the main GUI file.
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+                return JournalEvents(self.journal_path)
             return self._events
 
-    def _add_event(self, event_type, **kwargs):
+    def _add_event(self, event_type, at=None, **kwargs):
+        """Caller holds self._lock."""
         if not self._running:
             return
             
-        current_time = time.time()
+        current_time = time.time() if at is None else at
         delay = current_time - self._start_time
         self._start_time = current_time
 
         event = {"time": delay, "type": event_type, **kwargs}
-        self._events.append(event)
+        if self._journal:
+            self._journal.append(event)
+        else:
+            self._events.append(event)
         
         # Use the callback to notify the GUI
         self.action_callback(event)
 
-    def on_click(self, x, y, button, pressed):
+    def _flush_pending(self, final=False):
+        """Emits a pending press and the buffered motion path, in time order. Caller holds the lock."""
+        if final and self._pending_press is not None and not len(self._motion):
+            # Still held when recording stopped (e.g. the Stop button): keep it as a click
+            at, x, y, button = self._pending_press
+            self._pending_press = None
+            self._add_event("click", at=at, x=x, y=y, button=button)
+        if self._pending_press is not None:
+            # The button went down and the mouse moved: this is a drag
+            at, x, y, button = self._pending_press
+            self._pending_press = None
+            self._add_event("button_down", at=at, x=x, y=y, button=button)
+        if len(self._motion):
+            samples = simplify_path(self._motion.drain(), self.simplify, self.epsilon)
+            t0 = samples[0][0]
+            path = [[round(t - t0, 4), x, y] for t, x, y in samples]
+            self._add_event("move", at=t0, path=path)
+            # The next event's delay counts from the end of the path
+            self._start_time = samples[-1][0]
+
+    def _to_window(self, x, y):
+        """Screen -> recorded coordinates (window-relative with `relative_to`)."""
+        geometry = self._geometry
+        if geometry is None:
+            return x, y
+        geometry.poll() # Picks up ConfigureNotify; the origin is only re-queried after a move
+        return geometry.to_window(x, y)
+
+    # The callbacks below take an optional `at` timestamp (seconds) for
+    # capture backends with their own clock; pynput events use time.time().
+    # Positions are screen coordinates.
+
+    def on_move(self, x, y, at=None):
+        if not self._running:
+            return
+        now = time.time() if at is None else at
+        x, y = self._to_window(x, y)
+        with self._lock:
+            if self._pending_press is not None:
+                self._flush_pending()
+            if self._motion.append(now, x, y):
+                self._flush_pending() # Buffer full, emit what we have as one segment
+
+    def on_scroll(self, x, y, dx, dy, at=None):
+        x, y = self._to_window(x, y)
+        with self._lock:
+            self._flush_pending()
+            self._add_event("scroll", at=at, x=x, y=y, dx=dx, dy=dy)
+
+    def on_click(self, x, y, button, pressed, at=None):
+        x, y = self._to_window(x, y)
+        # Mouse and keyboard callbacks run on different threads; EventStore
+        # appends write several columns and must not interleave
+        with self._lock:
+            if self.record_motion:
+                self._on_click_with_motion(x, y, str(button), pressed, at)
+            elif pressed:
+                self._add_event(
+                    "click",
+                    at=at,
+                    x=x,
+                    y=y,
+                    button=str(button) # Convert button object to string
+                )
+
+    def _on_click_with_motion(self, x, y, button, pressed, at=None):
         if pressed:
-            self._add_event(
-                "click",
-                x=x,
-                y=y,
-                button=str(button) # Convert button object to string
-            )
+            self._flush_pending()
+            self._pending_press = (time.time() if at is None else at, x, y, button)
+        elif self._pending_press is not None and self._pending_press[3] == button:
+            # Released without moving: an ordinary click at the press time
+            at = self._pending_press[0]
+            self._pending_press = None
+            self._add_event("click", at=at, x=x, y=y, button=button)
+        else:
+            self._flush_pending()
+            self._add_event("button_up", at=at, x=x, y=y, button=button)
 
     def on_press(self, key):
         # Handle special keys and regular keys
         try:
             # For character keys
-            key_char = key.char
-            self._add_event("key_press", key=key_char)
+            key_str = key.char
         except AttributeError:
             # For special keys (e.g., shift, ctrl, space)
             key_str = str(key)
-            self._add_event("key_press", key=key_str)
+        self.on_key_str(key_str)
+
+    def on_key_str(self, key_str, at=None):
+        with self._lock:
+            if self.record_motion:
+                self._flush_pending()
+            self._add_event("key_press", at=at, key=key_str)
 
 if __name__ == '__main__':
     # Example usage for testing the recorder directly
@@ -73,7 +222,7 @@ if __name__ == '__main__':
     print("Starting recorder in 3 seconds...")
     time.sleep(3)
     
-    recorder = Recorder(action_callback=print_action)
+    recorder = Recorder(action_callback=print_action, record_motion=True)
     recorder.start()
     
     print("Recorder started. Click and type to see events. Press Ctrl+C to stop.")
@@ -0,0 +1,162 @@
+import math
+import threading
+import time
+
+# Queued X requests are flushed before any gap at least this long,
+# so bursts of closely spaced events go out together.
+FLUSH_GAP_NS = 1_000_000
+
+class LatenessStats:
+    """Running statistics of how late each event fired versus its deadline."""
+
+    def __init__(self):
+        self.count = 0
+        self.max_ns = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, lateness_ns):
+        # Welford's online update keeps this O(1) no matter how long we play
+        self.count += 1
+        if lateness_ns > self.max_ns:
+            self.max_ns = lateness_ns
+        diff = lateness_ns - self._mean
+        self._mean += diff / self.count
+        self._m2 += diff * (lateness_ns - self._mean)
+
+    @property
+    def mean_ms(self):
+        return self._mean / 1e6
+
+    @property
+    def max_ms(self):
+        return self.max_ns / 1e6
+
+    @property
+    def jitter_ms(self):
+        """Standard deviation of the lateness, in milliseconds."""
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.count - 1)) / 1e6
+
+    def summary(self):
+        return (f"{self.count} events, lateness mean {self.mean_ms:.3f} ms, "
+                f"max {self.max_ms:.3f} ms, jitter {self.jitter_ms:.3f} ms")
+
+
+class PlaybackScheduler:
+    """
+    Places events on an absolute monotonic timeline.
+
+    Each wait() advances the deadline by the event's delay instead of
+    measuring from "now", so the time spent executing events never
+    accumulates into drift. Waiting is a coarse sleep on the stop event
+    followed by a short busy wait for precision, and stop() wakes the
+    waiting thread immediately.
+
+    cycles() drives repeated playback on the same timeline, so there is no
+    drift at the wrap either, and limit() ends it at a time limit.
+    """
+
+    SPIN_NS = 1_500_000  # Last stretch before a deadline is busy-waited
+
+    def __init__(self, stop_event=None, spin_ns=SPIN_NS):
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.spin_ns = spin_ns
+        self.stats = LatenessStats()
+        self.cycles_completed = 0
+        self.expired = False # True once the time limit cut playback short
+        self._deadline_ns = None
+        self._end_ns = None
+
+    def start(self):
+        """Anchors the timeline at the current instant and resets the stats."""
+        self.stats = LatenessStats()
+        self.cycles_completed = 0
+        self.expired = False
+        self._deadline_ns = time.perf_counter_ns()
+
+    def limit(self, duration=None, deadline=None):
+        """
+        Ends the timeline `duration` seconds after start() or at the wall-clock
+        `deadline` (a time.time() value), whichever comes first. Events due
+        after the limit are not played.
+        """
+        ends = []
+        if duration is not None:
+            ends.append(self._deadline_ns + int(duration * 1e9))
+        if deadline is not None:
+            ends.append(time.perf_counter_ns() + int((deadline - time.time()) * 1e9))
+        self._end_ns = min(ends) if ends else None
+
+    def cycles(self, repetitions=None, on_progress=None, progress_interval=1.0):
+        """
+        Yields cycle numbers until `repetitions` cycles are done (None plays
+        forever), stop() is called or the time limit is reached. A cycle that
+        waited for no event ends the loop, so an empty plan does not spin.
+        on_progress(cycles_completed, stats) is called at most once per
+        `progress_interval` seconds, never once per cycle.
+        """
+        interval_ns = int(progress_interval * 1e9)
+        next_report_ns = time.perf_counter_ns() + interval_ns
+        cycle = 0
+        while repetitions is None or cycle < repetitions:
+            if self.stop_event.is_set() or self.expired:
+                return
+            played = self.stats.count
+            yield cycle
+            if self.stop_event.is_set() or self.expired:
+                return # The cycle was cut short
+            if self.stats.count == played:
+                return # Nothing to repeat
+            cycle += 1
+            self.cycles_completed = cycle
+            if on_progress is not None:
+                now = time.perf_counter_ns()
+                if now >= next_report_ns:
+                    on_progress(cycle, self.stats)
+                    next_report_ns = now + interval_ns
+
+    def stop(self):
+        self.stop_event.set()
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def wait(self, delay):
+        """Waits `delay` seconds past the previous deadline. Returns False if stopped."""
+        return self.wait_ns(int(delay * 1e9))
+
+    def wait_ns(self, delay_ns):
+        """Waits `delay_ns` nanoseconds past the previous deadline. Returns False if stopped."""
+        if self._deadline_ns is None:
+            self.start()
+        self._deadline_ns += delay_ns
+        deadline = self._deadline_ns
+        if self._end_ns is not None and deadline > self._end_ns:
+            self.expired = True
+            return False
+
+        remaining = deadline - time.perf_counter_ns()
+        if remaining > self.spin_ns:
+            if self.stop_event.wait((remaining - self.spin_ns) / 1e9):
+                return False
+
+        now = time.perf_counter_ns()
+        while now < deadline:
+            if self.stop_event.is_set():
+                return False
+            now = time.perf_counter_ns()
+
+        self.stats.add(now - deadline)
+        return not self.stop_event.is_set()
+
+
+if __name__ == '__main__':
+    # Measure the jitter achieved for 200 events spaced 5 ms apart
+    scheduler = PlaybackScheduler()
+    scheduler.start()
+    for _ in range(200):
+        scheduler.wait(0.005)
+    print(scheduler.stats.summary())
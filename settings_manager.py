@@ -6,6 +6,16 @@ class SettingsManager:
         self.filepath = filename
         self.default_settings = {
             "theme": "litera",
+            "playback_backend": "pynput",
+            "background_hold_ms": 50,
+            "record_motion": False,
+            "motion_simplify": "rdp",
+            "motion_epsilon": 2.0,
+            "journal_recording": False,
+            "journal_dir": "recordings",
+            "recorder_backend": "pynput",
+            "window_relative": False,
+            "hotkey_backend": "pynput",
             "hotkeys": {
                 "record": "Key.f1",
                 "stop": "Key.f2",
@@ -14,6 +14,15 @@ class SettingsWindow(ttk.Toplevel):
 
         # Variable for the theme
         self.theme_var = ttk.StringVar(value=current_settings.get("theme", "litera"))
+        self.backend_var = ttk.StringVar(value=current_settings.get("playback_backend", "pynput"))
+        self.hold_var = ttk.StringVar(value=str(current_settings.get("background_hold_ms", 50)))
+        self.record_motion_var = tk.BooleanVar(value=current_settings.get("record_motion", False))
+        self.simplify_var = ttk.StringVar(value=current_settings.get("motion_simplify", "rdp"))
+        self.epsilon_var = ttk.StringVar(value=str(current_settings.get("motion_epsilon", 2.0)))
+        self.journal_var = tk.BooleanVar(value=current_settings.get("journal_recording", False))
+        self.recorder_backend_var = ttk.StringVar(value=current_settings.get("recorder_backend", "pynput"))
+        self.window_relative_var = tk.BooleanVar(value=current_settings.get("window_relative", False))
+        self.hotkey_backend_var = ttk.StringVar(value=current_settings.get("hotkey_backend", "pynput"))
 
         self.hotkey_vars = {
             action: ttk.StringVar(value=key)
@@ -39,12 +48,47 @@ class SettingsWindow(ttk.Toplevel):
         )
         theme_combo.pack(side=LEFT, expand=True, fill=X, padx=5)
 
+        # --- Playback Engine ---
+        playback_frame = ttk.Labelframe(frame, text="Playback", padding=10)
+        playback_frame.grid(row=1, column=0, columnspan=2, sticky="ew", pady=(0, 15))
+        ttk.Label(playback_frame, text="Foreground engine:").pack(side=LEFT, padx=5)
+
+        backend_combo = ttk.Combobox(
+            playback_frame,
+            textvariable=self.backend_var,
+            values=["pynput", "xtest"],
+            state="readonly"
+        )
+        backend_combo.pack(side=LEFT, expand=True, fill=X, padx=5)
+
+        ttk.Label(playback_frame, text="Background hold (ms):").pack(side=LEFT, padx=5)
+        hold_spinbox = ttk.Spinbox(playback_frame, from_=0, to=1000, textvariable=self.hold_var, width=5)
+        hold_spinbox.pack(side=LEFT, padx=5)
+
+        # --- Recording ---
+        recording_frame = ttk.Labelframe(frame, text="Recording", padding=10)
+        recording_frame.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(0, 15))
+        ttk.Checkbutton(recording_frame, text="Record mouse movement, scrolling and drags",
+                        variable=self.record_motion_var).grid(row=0, column=0, columnspan=4, sticky="w", pady=(0, 5))
+        ttk.Label(recording_frame, text="Path simplification:").grid(row=1, column=0, sticky="w", padx=5)
+        ttk.Combobox(recording_frame, textvariable=self.simplify_var, values=["rdp", "decimate", "none"],
+                     state="readonly", width=10).grid(row=1, column=1, sticky="w", padx=5)
+        ttk.Label(recording_frame, text="Tolerance (px):").grid(row=1, column=2, sticky="w", padx=5)
+        ttk.Spinbox(recording_frame, from_=0, to=50, increment=0.5, textvariable=self.epsilon_var,
+                    width=5).grid(row=1, column=3, sticky="w", padx=5)
+        ttk.Checkbutton(recording_frame, text="Write recordings to a journal file (for long sessions)",
+                        variable=self.journal_var).grid(row=2, column=0, columnspan=4, sticky="w", pady=(5, 0))
+        ttk.Label(recording_frame, text="Capture engine:").grid(row=3, column=0, sticky="w", padx=5, pady=(5, 0))
+        ttk.Combobox(recording_frame, textvariable=self.recorder_backend_var, values=["pynput", "xrecord"],
+                     state="readonly", width=10).grid(row=3, column=1, sticky="w", padx=5, pady=(5, 0))
+        ttk.Checkbutton(recording_frame, text="Positions relative to the target window (record and play)",
+                        variable=self.window_relative_var).grid(row=4, column=0, columnspan=4, sticky="w", pady=(5, 0))
 
         # --- Hotkey Settings ---
         hotkey_frame = ttk.Labelframe(frame, text="Hotkeys", padding=10)
-        hotkey_frame.grid(row=1, column=0, columnspan=2, sticky="ew")
+        hotkey_frame.grid(row=3, column=0, columnspan=2, sticky="ew")
 
-        ttk.Label(hotkey_frame, text="Click on a field, then press the desired key.").grid(row=0, column=0, columnspan=2, pady=(0, 10))
+        ttk.Label(hotkey_frame, text="Click on a field, then press the desired key or chord (e.g. Ctrl+Alt+F1).").grid(row=0, column=0, columnspan=2, pady=(0, 10))
 
         row = 1
         for action, var in self.hotkey_vars.items():
@@ -55,9 +99,13 @@ class SettingsWindow(ttk.Toplevel):
             entry.bind("<Button-1>", lambda e, v=var, en=entry: self.set_focus_and_bind(v, en))
             row += 1
 
+        ttk.Label(hotkey_frame, text="Hotkey engine:").grid(row=row, column=0, sticky="w", padx=5, pady=5)
+        ttk.Combobox(hotkey_frame, textvariable=self.hotkey_backend_var, values=["pynput", "xgrab"],
+                     state="readonly", width=10).grid(row=row, column=1, sticky="w", padx=5, pady=5)
+
         # --- Buttons ---
         button_frame = ttk.Frame(frame)
-        button_frame.grid(row=2, column=0, columnspan=2, pady=(10, 0))
+        button_frame.grid(row=4, column=0, columnspan=2, pady=(10, 0))
 
         save_button = ttk.Button(button_frame, text="Save", command=self.save_and_close, bootstyle=SUCCESS)
         save_button.pack(side=LEFT, padx=5)
@@ -70,7 +118,8 @@ class SettingsWindow(ttk.Toplevel):
         entry.bind("<KeyPress>", lambda e, v=var, en=entry: self.capture_key(e, v, en), add="+")
 
     def capture_key(self, event, var, entry):
-        if event.keysym and event.keysym not in ('Shift_L', 'Shift_R', 'Control_L', 'Control_R', 'Alt_L', 'Alt_R'):
+        if event.keysym and event.keysym not in ('Shift_L', 'Shift_R', 'Control_L', 'Control_R', 'Alt_L', 'Alt_R',
+                                                 'Super_L', 'Super_R'):
             key_name = event.keysym
             if len(key_name) == 1:
                 key_str = key_name
@@ -86,7 +135,13 @@ class SettingsWindow(ttk.Toplevel):
                     key_str = f"Key.{key_name.lower()}"
                 else:
                     key_str = key_name
-            var.set(key_str)
+            # Held modifiers make a chord, e.g. Key.ctrl+Key.alt+Key.f1. Shift is
+            # part of a typed character already, so it only counts for named keys.
+            modifiers = [name for mask, name in ((0x4, 'Key.ctrl'), (0x8, 'Key.alt'), (0x40, 'Key.cmd'))
+                         if event.state & mask]
+            if event.state & 0x1 and len(key_str) > 1:
+                modifiers.append('Key.shift')
+            var.set('+'.join(modifiers + [key_str]))
         
         entry.unbind("<KeyPress>")
         self.focus()
@@ -96,6 +151,21 @@ class SettingsWindow(ttk.Toplevel):
         new_hotkeys = {action: var.get() for action, var in self.hotkey_vars.items()}
         self.current_settings["hotkeys"] = new_hotkeys
         self.current_settings["theme"] = self.theme_var.get()
+        self.current_settings["playback_backend"] = self.backend_var.get()
+        try:
+            self.current_settings["background_hold_ms"] = max(0, int(self.hold_var.get()))
+        except ValueError:
+            pass # Keep the previous value
+        self.current_settings["record_motion"] = self.record_motion_var.get()
+        self.current_settings["journal_recording"] = self.journal_var.get()
+        self.current_settings["recorder_backend"] = self.recorder_backend_var.get()
+        self.current_settings["window_relative"] = self.window_relative_var.get()
+        self.current_settings["hotkey_backend"] = self.hotkey_backend_var.get()
+        self.current_settings["motion_simplify"] = self.simplify_var.get()
+        try:
+            self.current_settings["motion_epsilon"] = max(0.0, float(self.epsilon_var.get()))
+        except ValueError:
+            pass
         
         if self.on_save:
             self.on_save(self.current_settings)
@@ -0,0 +1,32 @@
+import time
+from contextlib import contextmanager
+
+class StartupTrace:
+    """Records how long each startup phase takes (phase -> ms) since the trace was created."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = [] # (name, duration ms, ms since start)
+
+    @contextmanager
+    def phase(self, name):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.phases.append((name, (end - begin) * 1000, (end - self.start) * 1000))
+
+    def mark(self, name):
+        """Records an instant, e.g. "window mapped", as a zero-length phase."""
+        now = time.perf_counter()
+        self.phases.append((name, 0.0, (now - self.start) * 1000))
+
+    def report(self):
+        lines = [f"{'phase':<40} {'ms':>9} {'at ms':>9}"]
+        for name, duration, at in self.phases:
+            lines.append(f"{name:<40} {duration:>9.1f} {at:>9.1f}")
+        return "\n".join(lines)
+
+# Shared trace, created when the entry point first imports this module
+trace = StartupTrace()
@@ -0,0 +1,142 @@
+import tkinter as tk
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from tkinter import messagebox
+
+def _split(text):
+    return [part.strip() for part in text.split(',') if part.strip()]
+
+class TransformDialog(ttk.Toplevel):
+    def __init__(self, parent, selected_count=0):
+        super().__init__(parent)
+        self.title("Bulk Transform")
+        self.transient(parent)
+        self.wait_visibility() # Ensure the window is fully mapped before grabbing
+        self.grab_set()
+
+        self.selected_count = selected_count
+        self.entries = {}
+        self.result = None
+        self.scope_var = tk.StringVar(value="selection" if selected_count else "all")
+        self.delete_var = tk.BooleanVar(value=False)
+
+        master_frame = ttk.Frame(self, padding=15)
+        master_frame.pack(fill=BOTH, expand=True)
+
+        self.body(master_frame)
+        self.buttonbox(master_frame)
+
+        self.wait_window()
+
+    def body(self, master):
+        scope_frame = ttk.Labelframe(master, text="Apply to", padding=10)
+        scope_frame.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+        ttk.Radiobutton(scope_frame, text=f"Selected rows ({self.selected_count})", variable=self.scope_var,
+                        value="selection", state=NORMAL if self.selected_count else DISABLED).pack(side=LEFT, padx=5)
+        ttk.Radiobutton(scope_frame, text="All events", variable=self.scope_var, value="all").pack(side=LEFT, padx=5)
+
+        sections = [
+            ("Filter (blank = everything)", [
+                ("Types", "Types, e.g. click, key_press", ""),
+                ("Keys", "Keys, e.g. a, Key.enter", ""),
+                ("Region", "Region x0, y0, x1, y1", ""),
+            ]),
+            ("Timing", [
+                ("Delay_scale", "Delay scale", "1.0"),
+                ("Min_delay", "Min delay (s)", ""),
+                ("Max_delay", "Max delay (s)", ""),
+            ]),
+            ("Coordinates", [
+                ("Scale_x", "Scale X", "1.0"),
+                ("Scale_y", "Scale Y", "1.0"),
+                ("Shift_x", "Shift X", "0"),
+                ("Shift_y", "Shift Y", "0"),
+            ]),
+            ("Random jitter", [
+                ("Jitter_delay", "Delay +/- (s)", "0"),
+                ("Jitter_position", "Position +/- (px)", "0"),
+                ("Seed", "Seed (blank = random)", ""),
+            ]),
+        ]
+        for row, (title, fields) in enumerate(sections, start=1):
+            frame = ttk.Labelframe(master, text=title, padding=10)
+            frame.grid(row=row, column=0, columnspan=2, sticky="ew", pady=(0, 10))
+            for i, (key, label, default_val) in enumerate(fields):
+                ttk.Label(frame, text=f"{label}:").grid(row=i, column=0, sticky="w", padx=5, pady=3)
+                entry = ttk.Entry(frame)
+                entry.grid(row=i, column=1, sticky="ew", padx=5, pady=3)
+                entry.insert(0, default_val)
+                self.entries[key.lower()] = entry
+            frame.columnconfigure(1, weight=1)
+
+        ttk.Checkbutton(master, text="Delete the matching events instead", variable=self.delete_var).grid(
+            row=len(sections) + 1, column=0, columnspan=2, sticky="w", padx=5)
+        self.button_row = len(sections) + 2
+        master.columnconfigure(1, weight=1)
+
+    def buttonbox(self, master):
+        button_frame = ttk.Frame(master, padding=(0, 10, 0, 0))
+        button_frame.grid(row=self.button_row, column=0, columnspan=2, sticky="e")
+
+        ok_button = ttk.Button(button_frame, text="Apply", command=self.handle_ok, bootstyle=SUCCESS)
+        ok_button.pack(side=LEFT, padx=5)
+        cancel_button = ttk.Button(button_frame, text="Cancel", command=self.handle_cancel, bootstyle=DANGER)
+        cancel_button.pack(side=LEFT)
+
+    def handle_ok(self, event=None):
+        if not self.validate():
+            return
+        self.apply()
+        self.destroy()
+
+    def handle_cancel(self, event=None):
+        self.destroy()
+
+    def _float(self, key, default=None):
+        text = self.entries[key].get().strip()
+        return float(text) if text else default
+
+    def validate(self):
+        try:
+            region = _split(self.entries['region'].get())
+            if region and len(region) != 4:
+                raise ValueError
+            [int(v) for v in region]
+            for key in ('delay_scale', 'min_delay', 'max_delay', 'scale_x', 'scale_y', 'jitter_delay'):
+                self._float(key)
+            int(self.entries['shift_x'].get() or 0)
+            int(self.entries['shift_y'].get() or 0)
+            int(self.entries['jitter_position'].get() or 0)
+            int(self.entries['seed'].get() or 0)
+        except ValueError:
+            messagebox.showwarning("Bad input", "Please check your input values (numbers only; a region needs four comma-separated values).", parent=self)
+            return False
+        for key, label in (('delay_scale', "Delay scale"), ('scale_x', "Scale X"), ('scale_y', "Scale Y")):
+            if self._float(key, 1.0) <= 0:
+                messagebox.showwarning("Bad input", f"{label} must be greater than 0.", parent=self)
+                return False
+        if self._float('jitter_delay', 0.0) < 0 or int(self.entries['jitter_position'].get() or 0) < 0:
+            messagebox.showwarning("Bad input", "Jitter amounts cannot be negative.", parent=self)
+            return False
+        return True
+
+    def apply(self):
+        region = _split(self.entries['region'].get())
+        seed = self.entries['seed'].get().strip()
+        self.result = {
+            'scope': self.scope_var.get(),
+            'types': _split(self.entries['types'].get()) or None,
+            'keys': _split(self.entries['keys'].get()) or None,
+            'region': tuple(int(v) for v in region) if region else None,
+            'delete': self.delete_var.get(),
+            'delay_scale': self._float('delay_scale', 1.0),
+            'min_delay': self._float('min_delay'),
+            'max_delay': self._float('max_delay'),
+            'scale_x': self._float('scale_x', 1.0),
+            'scale_y': self._float('scale_y', 1.0),
+            'shift_x': int(self.entries['shift_x'].get() or 0),
+            'shift_y': int(self.entries['shift_y'].get() or 0),
+            'jitter_delay': self._float('jitter_delay', 0.0),
+            'jitter_position': int(self.entries['jitter_position'].get() or 0),
+            'seed': int(seed) if seed else None,
+        }
@@ -0,0 +1,230 @@
+import tkinter as tk
+import tkinter.font as tkfont
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+from collections import OrderedDict
+
+class VirtualEventList(ttk.Frame):
+    """
+    Listbox-like view of an event sequence that only renders the visible rows.
+
+    The inner tk.Listbox never holds more rows than fit on screen; scrolling
+    refills them from `get_events()` starting at the top index. Row strings
+    are formatted on demand and kept in a small LRU cache, and selection is
+    tracked by absolute event index, so cost does not depend on macro size.
+    """
+
+    def __init__(self, master, get_events, formatter, on_activate=None, cache_size=1024, **kwargs):
+        """
+        :param get_events: Returns the current sequence (len() and indexing are all that is used).
+        :param formatter: Turns one event into its row text.
+        :param on_activate: Called with the row index on double-click or Return.
+        """
+        super().__init__(master, **kwargs)
+        self.get_events = get_events
+        self.formatter = formatter
+        self.on_activate = on_activate
+        self.cache_size = cache_size
+        self._cache = OrderedDict() # index -> row text
+        self._top = 0
+        self._rows = 1
+        self._line_height = None
+        self._selection = set()
+        self._anchor = None
+        self._cursor = None
+
+        self.listbox = tk.Listbox(self, selectmode=EXTENDED, exportselection=False, activestyle=NONE)
+        self.listbox.pack(side=LEFT, fill=BOTH, expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient=VERTICAL, command=self._on_scrollbar, bootstyle="round")
+        self.scrollbar.pack(side=RIGHT, fill=Y)
+
+        lb = self.listbox
+        lb.bind("<Configure>", self._on_configure)
+        lb.bind("<Button-1>", lambda e: self._on_click(e, extend=False, toggle=False))
+        lb.bind("<Shift-Button-1>", lambda e: self._on_click(e, extend=True, toggle=False))
+        lb.bind("<Control-Button-1>", lambda e: self._on_click(e, extend=False, toggle=True))
+        lb.bind("<B1-Motion>", self._on_drag)
+        lb.bind("<Double-1>", self._on_double)
+        lb.bind("<Return>", self._on_return)
+        lb.bind("<MouseWheel>", lambda e: self._scroll_units(-3 if e.delta > 0 else 3))
+        lb.bind("<Button-4>", lambda e: self._scroll_units(-3))
+        lb.bind("<Button-5>", lambda e: self._scroll_units(3))
+        for key, step in (("Up", -1), ("Down", 1), ("Prior", "-page"), ("Next", "page"), ("Home", "home"), ("End", "end")):
+            lb.bind(f"<{key}>", lambda e, s=step: self._on_key(s, extend=False))
+            lb.bind(f"<Shift-{key}>", lambda e, s=step: self._on_key(s, extend=True))
+        lb.bind("<Control-a>", self._select_all)
+        # Keep the Listbox's own scroll and selection bindings out of the way
+        lb.bind("<B1-Leave>", lambda e: "break")
+        lb.bind("<ButtonRelease-1>", lambda e: "break")
+
+    # --- Listbox-like API ---
+
+    def size(self):
+        return len(self.get_events())
+
+    def curselection(self):
+        return tuple(sorted(self._selection))
+
+    def selection_clear(self):
+        self._selection.clear()
+        self._render()
+
+    def selection_set(self, index):
+        self._selection = {index}
+        self._anchor = self._cursor = index
+        self._render()
+
+    def see(self, index):
+        """Scrolls so that `index` (or END) is visible."""
+        size = self.size()
+        if index == END:
+            index = size - 1
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + self._rows:
+            self._top = index - self._rows + 1
+        self._render()
+
+    def refresh(self, keep_selection=False):
+        """Re-reads the events after they changed; drops cached rows and, by default, the selection."""
+        self._cache.clear()
+        if not keep_selection:
+            self._selection.clear()
+            self._anchor = self._cursor = None
+        else:
+            size = self.size()
+            self._selection = {i for i in self._selection if i < size}
+        self._render()
+
+    # --- Rendering ---
+
+    def _text(self, index):
+        cache = self._cache
+        try:
+            cache.move_to_end(index)
+            return cache[index]
+        except KeyError:
+            text = self.formatter(self.get_events()[index])
+            cache[index] = text
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+            return text
+
+    def _render(self):
+        size = self.size()
+        self._top = max(0, min(self._top, size - self._rows))
+        end = min(size, self._top + self._rows)
+        lb = self.listbox
+        lb.delete(0, END)
+        if end > self._top:
+            lb.insert(END, *[self._text(i) for i in range(self._top, end)])
+        for index in self._selection:
+            if self._top <= index < end:
+                lb.selection_set(index - self._top)
+        if size:
+            self.scrollbar.set(self._top / size, end / size)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def _on_configure(self, event):
+        lb = self.listbox
+        if self._line_height is None:
+            # Same row height Tk's listbox uses: linespace + 1 + selection border
+            linespace = tkfont.Font(font=lb.cget("font")).metrics("linespace")
+            self._line_height = linespace + 1 + 2 * int(lb.cget("selectborderwidth"))
+        inner = event.height - 2 * (int(lb.cget("borderwidth")) + int(lb.cget("highlightthickness")))
+        rows = max(1, inner // self._line_height)
+        if rows != self._rows:
+            self._rows = rows
+            self._render()
+
+    # --- Scrolling ---
+
+    def _on_scrollbar(self, *args):
+        size = self.size()
+        if args[0] == 'moveto':
+            self._top = int(float(args[1]) * size)
+        elif args[0] == 'scroll':
+            amount = int(args[1]) * (self._rows if args[2] == 'pages' else 1)
+            self._top += amount
+        self._render()
+
+    def _scroll_units(self, amount):
+        self._top += amount
+        self._render()
+        return "break"
+
+    # --- Selection ---
+
+    def _index_at(self, y):
+        index = self._top + self.listbox.nearest(y)
+        return index if index < self.size() else None
+
+    def _select_to(self, index, extend=False, toggle=False):
+        if extend and self._anchor is not None:
+            low, high = sorted((self._anchor, index))
+            self._selection = set(range(low, high + 1))
+        elif toggle:
+            self._selection ^= {index}
+            self._anchor = index
+        else:
+            self._selection = {index}
+            self._anchor = index
+        self._cursor = index
+
+    def _on_click(self, event, extend, toggle):
+        self.listbox.focus_set()
+        index = self._index_at(event.y)
+        if index is not None:
+            self._select_to(index, extend, toggle)
+            self._render()
+        return "break"
+
+    def _on_drag(self, event):
+        if self._anchor is None:
+            return "break"
+        if event.y < 0:
+            self._top -= 1
+        elif event.y > self.listbox.winfo_height():
+            self._top += 1
+        index = self._index_at(min(max(event.y, 0), self.listbox.winfo_height()))
+        if index is not None:
+            self._select_to(index, extend=True)
+        self._render()
+        return "break"
+
+    def _on_key(self, step, extend):
+        size = self.size()
+        if not size:
+            return "break"
+        current = self._cursor if self._cursor is not None else self._top
+        if step == "home":
+            index = 0
+        elif step == "end":
+            index = size - 1
+        elif step == "page":
+            index = current + self._rows
+        elif step == "-page":
+            index = current - self._rows
+        else:
+            index = current + step
+        index = max(0, min(size - 1, index))
+        self._select_to(index, extend=extend)
+        self.see(index)
+        return "break"
+
+    def _select_all(self, event=None):
+        self._selection = set(range(self.size()))
+        self._render()
+        return "break"
+
+    def _on_double(self, event):
+        index = self._index_at(event.y)
+        if index is not None and self.on_activate:
+            self.on_activate(index)
+        return "break"
+
+    def _on_return(self, event):
+        if self._cursor is not None and self.on_activate:
+            self.on_activate(self._cursor)
+        return "break"
@@ -0,0 +1,104 @@
+from Xlib import error, X
+
+class WindowGeometry:
+    """
+    Cached screen position of a window's origin.
+
+    The origin is asked from the server once (translate_coords) and then
+    reused until a ConfigureNotify or ReparentNotify on the window or one of
+    its ancestors (e.g. the window manager's frame) says it may have moved,
+    so converting between screen and window coordinates per event costs no
+    round trip.
+
+    Events arrive on the connection passed in: either feed them to
+    handle_event() from an existing event loop, or call poll() when the
+    connection is not read anywhere else. close() deselects the events
+    again, which a pooled connection needs before it is released.
+    """
+
+    def __init__(self, disp, window):
+        self.display = disp
+        self.root = disp.screen().root
+        self.window = disp.create_resource_object('window', getattr(window, 'id', window))
+        self._watched = set() # Ids of the window and its ancestors
+        self._origin = None
+        self.queries = 0 # translate_coords round trips made so far
+
+    def _watch_ancestors(self):
+        """Selects StructureNotify on the window and each ancestor below the root."""
+        old, self._watched = self._watched, set()
+        window = self.window
+        while window.id != self.root.id:
+            window.change_attributes(event_mask=X.StructureNotifyMask)
+            self._watched.add(window.id)
+            window = window.query_tree().parent
+        self._unwatch(old - self._watched) # Former ancestors, e.g. a frame we were reparented out of
+
+    def _unwatch(self, window_ids):
+        catch = error.CatchError(error.BadWindow, error.BadValue)
+        for window_id in window_ids:
+            self.display.create_resource_object('window', window_id).change_attributes(event_mask=0,
+                                                                                       onerror=catch)
+
+    def close(self):
+        """Deselects the events of the watched windows and drops those already queued."""
+        try:
+            self._unwatch(self._watched)
+            self.display.flush()
+            self.poll()
+        except error.ConnectionClosedError:
+            pass
+        self._watched = set()
+        self._origin = None
+
+    def origin(self):
+        """(x, y) of the window's top-left corner on the screen."""
+        if self._origin is None:
+            self._watch_ancestors()
+            translated = self.root.translate_coords(self.window, 0, 0)
+            self._origin = (translated.x, translated.y)
+            self.queries += 1
+        return self._origin
+
+    def handle_event(self, ev):
+        """Drops the cached origin if `ev` may have moved the window. Returns True if it did."""
+        if ev.type in (X.ConfigureNotify, X.ReparentNotify, X.DestroyNotify) and ev.window.id in self._watched:
+            self._origin = None
+            return True
+        return False
+
+    def poll(self):
+        """Handles the events queued on the connection, without blocking."""
+        try:
+            while self.display.pending_events():
+                self.handle_event(self.display.next_event())
+        except error.ConnectionClosedError:
+            self._origin = None
+
+    def to_window(self, x, y):
+        """Screen coordinates -> window coordinates."""
+        ox, oy = self.origin()
+        return x - ox, y - oy
+
+    def to_screen(self, x, y):
+        """Window coordinates -> screen coordinates."""
+        ox, oy = self.origin()
+        return x + ox, y + oy
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    from x_connection import connections
+
+    # Usage: python3 window_geometry.py 0x1200007
+    connection = connections.acquire()
+    geometry = WindowGeometry(connection.display, int(sys.argv[1], 0))
+    print("Move the window around; Ctrl+C to stop.")
+    try:
+        while True:
+            geometry.poll()
+            print(f"origin {geometry.origin()}, {geometry.queries} queries, {connection.stats.summary()}")
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,214 @@
+import threading
+from collections import namedtuple
+from Xlib import error, X, Xatom
+from Xlib.protocol import request
+from x_connection import connections
+
+WindowInfo = namedtuple('WindowInfo', 'id title wm_class pid')
+
+CLIENT_EVENT_MASK = X.PropertyChangeMask | X.StructureNotifyMask
+PROPERTY_LENGTH = 1024 # In 32-bit units; longer titles are cut off
+
+def _text(value, encoding):
+    if isinstance(value, bytes):
+        return value.decode(encoding, 'replace')
+    return value or ''
+
+class WindowIndex:
+    """
+    Cache of the top-level windows, keyed by window id.
+
+    The window list comes from the window manager's _NET_CLIENT_LIST (or the
+    viewable children of the root without an EWMH window manager). The
+    property requests for a whole batch of windows are sent before the first
+    reply is read, so filling the index costs about one round trip instead of
+    several per window. After that a background thread keeps it current from
+    PropertyNotify, CreateNotify and DestroyNotify events rather than rescanning.
+    """
+
+    def __init__(self, display_name=None):
+        # Kept for good: the update thread blocks on this connection
+        self.connection = connections.acquire(display_name)
+        self.display = self.connection.display
+        self.root = self.display.screen().root
+        self.windows = {} # id -> WindowInfo, in stacking/client list order
+        self.version = 0 # Bumped whenever `windows` changes
+        self._lock = threading.Lock()
+        self._thread = None
+        self._ewmh = False
+        self._ignore_errors = error.CatchError(error.BadWindow)
+
+        self._client_list = self.display.intern_atom('_NET_CLIENT_LIST')
+        self._net_wm_name = self.display.intern_atom('_NET_WM_NAME')
+        self._net_wm_pid = self.display.intern_atom('_NET_WM_PID')
+        self._properties = (self._net_wm_name, Xatom.WM_NAME, Xatom.WM_CLASS, self._net_wm_pid)
+
+        self.root.change_attributes(event_mask=X.PropertyChangeMask | X.SubstructureNotifyMask)
+        self._set_windows(self._fetch(self._client_ids()))
+
+    # --- Queries (safe from any thread) ---
+
+    def snapshot(self):
+        """Returns the indexed windows as a list of WindowInfo."""
+        with self._lock:
+            return list(self.windows.values())
+
+    def get(self, window_id):
+        with self._lock:
+            return self.windows.get(window_id)
+
+    def filter(self, text):
+        """Returns the windows whose title, WM_CLASS or PID contains `text` (case-insensitive)."""
+        needle = text.strip().lower()
+        windows = self.snapshot()
+        if not needle:
+            return windows
+        return [info for info in windows
+                if needle in info.title.lower() or needle in info.wm_class.lower()
+                or (info.pid is not None and needle in str(info.pid))]
+
+    def window(self, window_id):
+        """Window object for `window_id` on the index's connection (no round trip)."""
+        return self.display.create_resource_object('window', window_id)
+
+    # --- Background updates ---
+
+    def start(self):
+        """Starts the thread that applies window events to the index."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            while True:
+                events = [self.display.next_event()]
+                # Apply a burst of events (e.g. a title that keeps changing) as one batch
+                while self.display.pending_events():
+                    events.append(self.display.next_event())
+                self._apply(events)
+        except error.ConnectionClosedError as e:
+            print(f"Window index stopped: {e}")
+
+    def _apply(self, events):
+        rescan = False
+        dirty = set()
+        gone = set()
+        for ev in events:
+            if ev.type == X.PropertyNotify:
+                if ev.window.id == self.root.id:
+                    rescan = rescan or ev.atom == self._client_list
+                elif ev.atom in self._properties:
+                    dirty.add(ev.window.id)
+            elif ev.type == X.DestroyNotify:
+                gone.add(ev.window.id)
+            elif ev.type in (X.CreateNotify, X.MapNotify, X.UnmapNotify) and not self._ewmh:
+                rescan = True # Without a client list, the root's children are the list
+
+        with self._lock:
+            windows = dict(self.windows)
+        new = []
+        if rescan:
+            ids = self._client_ids()
+            new = [wid for wid in ids if wid not in windows]
+            windows = {wid: windows[wid] for wid in ids if wid in windows}
+        for wid in gone:
+            windows.pop(wid, None)
+        dirty = [wid for wid in dirty if wid in windows]
+        fetched = self._fetch(new + dirty)
+        for wid in dirty:
+            if wid not in fetched:
+                del windows[wid] # Destroyed while we were asking
+        windows.update(fetched)
+        self._set_windows(windows)
+
+    def _set_windows(self, windows):
+        with self._lock:
+            if windows != self.windows:
+                self.windows = windows
+                self.version += 1
+
+    # --- X requests ---
+
+    def _client_ids(self):
+        """Ids of the top-level windows, in the window manager's client list order if there is one."""
+        try:
+            prop = self.root.get_full_property(self._client_list, Xatom.WINDOW)
+        except error.XError:
+            prop = None
+        self._ewmh = prop is not None
+        if self._ewmh:
+            return list(prop.value)
+
+        children = self.root.query_tree().children
+        pending = [request.GetWindowAttributes(display=self.display.display, defer=True, window=child.id)
+                   for child in children]
+        ids = []
+        for child, attrs in zip(children, pending):
+            try:
+                attrs.reply()
+                if attrs.map_state == X.IsViewable:
+                    ids.append(child.id)
+            except error.XError:
+                pass # Destroyed since query_tree
+        return ids
+
+    def _get_property(self, window_id, atom):
+        return request.GetProperty(display=self.display.display, defer=True, delete=False, window=window_id,
+                                   property=atom, type=X.AnyPropertyType, long_offset=0,
+                                   long_length=PROPERTY_LENGTH)
+
+    def _fetch(self, ids):
+        """
+        Reads the title, class and pid of each window. All requests are queued
+        first and the replies collected afterwards, so the batch shares one
+        round trip. Windows that no longer exist are left out.
+        """
+        pending = []
+        for wid in ids:
+            # Also watch the window itself so title changes and its destruction reach us
+            self.window(wid).change_attributes(event_mask=CLIENT_EVENT_MASK, onerror=self._ignore_errors)
+            pending.append((wid, [self._get_property(wid, atom) for atom in self._properties]))
+
+        fetched = {}
+        for wid, replies in pending:
+            try:
+                values = []
+                for reply in replies:
+                    reply.reply()
+                    values.append(reply.value if reply.property_type != X.NONE else None)
+            except error.XError:
+                continue
+            net_name, wm_name, wm_class, pid = values
+            title = _text(net_name, 'utf-8') or _text(wm_name, 'latin-1')
+            classes = [part for part in _text(wm_class, 'latin-1').split('\0') if part]
+            fetched[wid] = WindowInfo(wid, title, classes[-1] if classes else '',
+                                      pid[0] if pid is not None and len(pid) else None)
+        return fetched
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_index(display_name=None):
+    """Returns the shared, self-updating WindowIndex for a display, creating it on first use."""
+    with _indexes_lock:
+        index = _indexes.get(display_name)
+        if index is None or not index._thread.is_alive():
+            # First use, or the connection was lost (e.g. the X server restarted)
+            if index is not None:
+                index.connection.close()
+            index = _indexes[display_name] = WindowIndex(display_name)
+            index.start()
+        return index
+
+
+if __name__ == '__main__':
+    import time
+
+    start = time.perf_counter()
+    index = WindowIndex()
+    elapsed = time.perf_counter() - start
+    print(f"Indexed {len(index.windows)} windows in {elapsed * 1000:.1f} ms "
+          f"({'_NET_CLIENT_LIST' if index._ewmh else 'query_tree'})")
+    for info in index.snapshot():
+        print(f"0x{info.id:08x}  {info.pid or '-':>7}  {info.wm_class[:20]:<20}  {info.title}")
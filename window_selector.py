@@ -1,57 +1,63 @@
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from Xlib import display, X
+from window_index import get_index
+
+POLL_INTERVAL_MS = 250
+
+def format_window(info):
+    """Row text for a WindowInfo: title - class (pid) [id]."""
+    text = info.title or "(untitled)"
+    if info.wm_class:
+        text += f"  -  {info.wm_class}"
+    if info.pid:
+        text += f" (pid {info.pid})"
+    return f"{text}  [0x{info.id:x}]"
 
 class WindowSelector(ttk.Toplevel):
     def __init__(self, master):
         super().__init__(master)
         self.title("Select Target Window")
-        self.geometry("400x500")
+        self.geometry("500x500")
         self.transient(master)
         self.grab_set()
 
         self.selected_window = None
-        self.windows = self.get_open_windows()
-
-        self.create_widgets()
-        self.protocol("WM_DELETE_WINDOW", self.on_cancel)
-
-    def get_open_windows(self):
-        windows = {}
-        d = display.Display()
-        root = d.screen().root
-
+        self.selected_windows = [] # All selected windows, for fan-out playback
+        self.window_ids = [] # Window id of each listbox row
+        self._version = None
+        self._poll_job = None
         try:
-            for window in root.query_tree().children:
-                try:
-                    attrs = window.get_attributes()
-                    if attrs and attrs.map_state == X.IsViewable:
-                        name = window.get_wm_name()
-                        if not name:
-                            name = window.get_icccm_name()
-                        
-                        if name:
-                            windows[name] = window
-                except Exception:
-                    # Ignore windows that cause errors (e.g., have been destroyed)
-                    pass
+            # The index is shared and kept up to date in the background, so
+            # only the first dialog pays for the (batched) initial scan
+            self.index = get_index()
         except Exception as e:
             print(f"Error getting open windows: {e}")
+            self.index = None
 
-        return windows
+        self.create_widgets()
+        self.protocol("WM_DELETE_WINDOW", self.on_cancel)
+        self.populate()
+        self._poll()
 
     def create_widgets(self):
         frame = ttk.Frame(self, padding="10")
         frame.pack(fill=tk.BOTH, expand=True)
 
-        ttk.Label(frame, text="Select a window to target:").pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(frame, text="Select a window to target (Ctrl/Shift-click for several):").pack(fill=tk.X, pady=(0, 5))
 
-        self.window_listbox = tk.Listbox(frame)
-        self.window_names = list(self.windows.keys())
-        for name in self.window_names:
-            self.window_listbox.insert(tk.END, name)
+        self.filter_var = tk.StringVar()
+        self.filter_entry = ttk.Entry(frame, textvariable=self.filter_var)
+        self.filter_entry.pack(fill=tk.X, pady=(0, 5))
+        self.filter_var.trace_add("write", lambda *args: self.populate())
+        self.filter_entry.bind("<Down>", lambda e: self._focus_list())
+        self.filter_entry.bind("<Return>", lambda e: self.on_ok())
+        self.filter_entry.focus_set()
+
+        self.window_listbox = tk.Listbox(frame, selectmode=tk.EXTENDED)
         self.window_listbox.pack(fill=tk.BOTH, expand=True)
+        self.window_listbox.bind("<Double-1>", lambda e: self.on_ok())
+        self.window_listbox.bind("<Return>", lambda e: self.on_ok())
 
         button_frame = ttk.Frame(frame, padding=(0, 10, 0, 0))
         button_frame.pack(fill=tk.X)
@@ -62,15 +68,52 @@ class WindowSelector(ttk.Toplevel):
         cancel_button = ttk.Button(button_frame, text="Cancel", command=self.on_cancel, bootstyle=DANGER)
         cancel_button.pack(side=tk.RIGHT)
 
+    def populate(self):
+        """Fills the list with the windows matching the filter text (title, WM_CLASS or PID), keeping the selection."""
+        if self.index is None:
+            return
+        selected = {self.window_ids[i] for i in self.window_listbox.curselection()}
+        self._version = self.index.version
+        windows = self.index.filter(self.filter_var.get())
+        self.window_ids = [info.id for info in windows]
+        self.window_listbox.delete(0, tk.END)
+        if windows:
+            self.window_listbox.insert(tk.END, *[format_window(info) for info in windows])
+        for row, window_id in enumerate(self.window_ids):
+            if window_id in selected:
+                self.window_listbox.selection_set(row)
+
+    def _poll(self):
+        # Windows opened, closed or renamed while the dialog is up
+        if self.index is not None and self.index.version != self._version:
+            self.populate()
+        self._poll_job = self.after(POLL_INTERVAL_MS, self._poll)
+
+    def _focus_list(self):
+        self.window_listbox.focus_set()
+        if self.window_ids and not self.window_listbox.curselection():
+            self.window_listbox.selection_set(0)
+            self.window_listbox.activate(0)
+        return "break"
+
+    def destroy(self):
+        if self._poll_job is not None:
+            self.after_cancel(self._poll_job)
+            self._poll_job = None
+        super().destroy()
+
     def on_ok(self):
         selection = self.window_listbox.curselection()
+        if not selection and len(self.window_ids) == 1:
+            selection = (0,) # The filter narrowed it down to one window
         if selection:
-            selected_name = self.window_names[selection[0]]
-            self.selected_window = self.windows[selected_name]
+            self.selected_windows = [self.index.window(self.window_ids[i]) for i in selection]
+            self.selected_window = self.selected_windows[0]
         self.destroy()
 
     def on_cancel(self):
         self.selected_window = None
+        self.selected_windows = []
         self.destroy()
 
 if __name__ == '__main__':
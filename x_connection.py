@@ -0,0 +1,190 @@
+import importlib
+import threading
+import time
+import weakref
+from Xlib import display, error, X
+
+# Real locks in every Display (python-xlib uses no-op ones by default); must
+# happen before the first Display is opened, as some are shared by threads
+importlib.import_module('Xlib.threaded')
+
+class XStats:
+    """Traffic counters of one X connection."""
+
+    def __init__(self, requests=0, flushes=0, round_trips=0):
+        self.requests = requests # Requests queued
+        self.flushes = flushes # Explicit flushes of the output buffer
+        self.round_trips = round_trips # Times we blocked waiting for a reply
+
+    def copy(self):
+        return XStats(self.requests, self.flushes, self.round_trips)
+
+    def since(self, before):
+        """Counts accumulated after the `before` copy was taken."""
+        return XStats(self.requests - before.requests, self.flushes - before.flushes,
+                      self.round_trips - before.round_trips)
+
+    def add(self, other):
+        self.requests += other.requests
+        self.flushes += other.flushes
+        self.round_trips += other.round_trips
+
+    def summary(self):
+        return f"{self.requests} requests, {self.flushes} flushes, {self.round_trips} round trips"
+
+class XConnection:
+    """
+    One long-lived Display with traffic counters.
+
+    `cache` holds per-connection state that is expensive to build (a KeyMap,
+    a ServerClock) so that the next user of the connection can reuse it.
+    `on_release` holds callbacks that undo a user's state on the server
+    (e.g. event selections); they run once when the connection is released.
+    """
+
+    def __init__(self, display_name=None):
+        self.display_name = display_name
+        self.display = display.Display(display_name)
+        self.stats = XStats()
+        self.cache = {}
+        self.on_release = []
+        self._instrument()
+
+    def _instrument(self):
+        # Count at the protocol layer, which every request, flush and reply wait goes through
+        proto = self.display.display
+        stats = self.stats
+        send_request, flush, send_and_recv = proto.send_request, proto.flush, proto.send_and_recv
+        waited = None
+
+        def counting_send_request(request, wait_for_response):
+            stats.requests += 1
+            return send_request(request, wait_for_response)
+
+        def counting_flush():
+            stats.flushes += 1
+            return flush()
+
+        def counting_send_and_recv(flush=False, event=False, request=None, recv=False):
+            nonlocal waited
+            if request is not None and request != waited:
+                # reply() may loop several times for one request; count it once
+                waited = request
+                stats.round_trips += 1
+            return send_and_recv(flush=flush, event=event, request=request, recv=recv)
+
+        proto.send_request = counting_send_request
+        proto.flush = counting_flush
+        proto.send_and_recv = counting_send_and_recv
+
+    def cached(self, key, factory, max_age=None):
+        """Returns cache[key], building it with factory() on first use or once it is `max_age` seconds old."""
+        entry = self.cache.get(key)
+        now = time.monotonic()
+        if entry is None or (max_age is not None and now - entry[1] > max_age):
+            entry = self.cache[key] = (factory(), now)
+        return entry[0]
+
+    def discard_events(self):
+        """
+        Drops the events queued for the previous user. A keyboard mapping
+        change among them also drops the cached KeyMap, so the next user
+        builds a current one.
+        """
+        while self.display.pending_events():
+            ev = self.display.next_event()
+            if ev.type == X.MappingNotify and ev.request == X.MappingKeyboard:
+                self.display.refresh_keyboard_mapping(ev)
+                self.cache.pop('keymap', None)
+
+    def close(self):
+        try:
+            self.display.close()
+        except (error.ConnectionClosedError, OSError):
+            pass
+
+class XConnectionManager:
+    """
+    Pool of long-lived X connections per display name.
+
+    acquire() hands out a connection for the caller's exclusive use (e.g. one
+    playback thread), reusing an idle one when there is one, so repeated
+    plays skip the connection setup. release() returns it to the pool. Dead
+    connections are dropped on the way in and out, so a server reset costs
+    one reconnect instead of an error on every later play.
+    """
+
+    def __init__(self):
+        self._idle = {} # display name -> [XConnection]
+        self._stats = {} # display name -> [XStats of every connection ever opened]
+        self._lock = threading.Lock()
+
+    def acquire(self, display_name=None):
+        with self._lock:
+            idle = self._idle.get(display_name, [])
+            while idle:
+                connection = idle.pop()
+                try:
+                    connection.discard_events() # Also whatever arrived while it sat idle
+                    return connection
+                except (error.ConnectionClosedError, OSError):
+                    connection.close()
+        connection = XConnection(display_name)
+        with self._lock:
+            self._stats.setdefault(display_name, []).append(connection.stats)
+        return connection
+
+    def release(self, connection):
+        callbacks, connection.on_release = connection.on_release, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Cleanup of an X connection failed: {e}")
+        try:
+            connection.discard_events()
+        except (error.ConnectionClosedError, OSError):
+            connection.close()
+            return
+        with self._lock:
+            self._idle.setdefault(connection.display_name, []).append(connection)
+
+    def lease(self, owner, display_name=None):
+        """
+        Acquires a connection that goes back to the pool when `owner` is
+        garbage collected. Returns (connection, release); calling release()
+        returns it earlier.
+        """
+        connection = self.acquire(display_name)
+        return connection, weakref.finalize(owner, self.release, connection)
+
+    def totals(self, display_name=None):
+        """Traffic summed over all connections ever opened to a display."""
+        total = XStats()
+        with self._lock:
+            for stats in self._stats.get(display_name, []):
+                total.add(stats)
+        return total
+
+    def close_all(self):
+        """Closes the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+connections = XConnectionManager()
+
+
+if __name__ == '__main__':
+    for attempt in range(3):
+        start = time.perf_counter()
+        connection = connections.acquire()
+        elapsed = time.perf_counter() - start
+        before = connection.stats.copy()
+        connection.display.screen().root.get_geometry()
+        connection.display.flush()
+        print(f"acquire #{attempt + 1}: {elapsed * 1000:.2f} ms, then {connection.stats.since(before).summary()}")
+        connections.release(connection)
+    print(f"Total: {connections.totals().summary()}")
@@ -0,0 +1,150 @@
+from Xlib import X, XK
+
+# pynput Key names (as recorded, e.g. "Key.enter") mapped to X keysym names
+PYNPUT_KEYSYM_NAMES = {
+    'alt': 'Alt_L', 'alt_l': 'Alt_L', 'alt_r': 'Alt_R', 'alt_gr': 'ISO_Level3_Shift',
+    'backspace': 'BackSpace', 'caps_lock': 'Caps_Lock',
+    'cmd': 'Super_L', 'cmd_l': 'Super_L', 'cmd_r': 'Super_R',
+    'ctrl': 'Control_L', 'ctrl_l': 'Control_L', 'ctrl_r': 'Control_R',
+    'delete': 'Delete', 'down': 'Down', 'end': 'End', 'enter': 'Return',
+    'esc': 'Escape', 'home': 'Home', 'insert': 'Insert', 'left': 'Left',
+    'menu': 'Menu', 'num_lock': 'Num_Lock', 'page_down': 'Next', 'page_up': 'Prior',
+    'pause': 'Pause', 'print_screen': 'Print', 'right': 'Right',
+    'scroll_lock': 'Scroll_Lock', 'shift': 'Shift_L', 'shift_l': 'Shift_L',
+    'shift_r': 'Shift_R', 'space': 'space', 'tab': 'Tab', 'up': 'Up',
+    'media_play_pause': 'XF86AudioPlay', 'media_volume_mute': 'XF86AudioMute',
+    'media_volume_down': 'XF86AudioLowerVolume', 'media_volume_up': 'XF86AudioRaiseVolume',
+    'media_previous': 'XF86AudioPrev', 'media_next': 'XF86AudioNext',
+}
+
+def char_to_keysym(char):
+    """Returns the keysym of a single character (Latin-1 directly, other Unicode via 0x01000000)."""
+    codepoint = ord(char)
+    if 0x20 <= codepoint <= 0x7e or 0xa0 <= codepoint <= 0xff:
+        return codepoint
+    return 0x01000000 | codepoint
+
+def key_str_to_keysym(key_str):
+    """
+    Converts a recorded key string to an X keysym.
+    Accepts plain characters ("a", "!"), pynput names ("Key.enter", "Key.f5")
+    and pynput's "<keysym>" form for keys without a character.
+    Returns X.NoSymbol (0) if the key is unknown.
+    """
+    if not key_str:
+        return XK.NoSymbol
+    if key_str[0] == '<' and key_str[-1] == '>' and key_str[1:-1].isdigit():
+        return int(key_str[1:-1])
+    if key_str.startswith('Key.'):
+        name = key_str[4:]
+        if name[:1] == 'f' and name[1:].isdigit():
+            return XK.string_to_keysym(name.upper())
+        return XK.string_to_keysym(PYNPUT_KEYSYM_NAMES.get(name, name))
+    if len(key_str) == 1:
+        return char_to_keysym(key_str)
+    # Fall back to X keysym names such as "Return"
+    return XK.string_to_keysym(key_str)
+
+# X keysym -> recorded key string, the reverse of the table above. The first
+# pynput name wins, matching what pynput itself reports ("Key.alt" for Alt_L).
+_KEYSYM_KEY_STRS = {}
+for _name, _keysym_name in PYNPUT_KEYSYM_NAMES.items():
+    _keysym = XK.string_to_keysym(_keysym_name)
+    if _keysym:
+        _KEYSYM_KEY_STRS.setdefault(_keysym, 'Key.' + _name)
+for _n in range(1, 21):
+    _KEYSYM_KEY_STRS[XK.string_to_keysym(f'F{_n}')] = f'Key.f{_n}'
+
+def keysym_to_key_str(keysym):
+    """
+    Converts an X keysym to the key string pynput would have recorded:
+    the character for printable keys, "Key.<name>" for special keys and
+    "<keysym>" for anything else.
+    """
+    key_str = _KEYSYM_KEY_STRS.get(keysym)
+    if key_str is not None:
+        return key_str
+    if 0x20 <= keysym <= 0x7e or 0xa0 <= keysym <= 0xff:
+        return chr(keysym)
+    if keysym & 0xff000000 == 0x01000000:
+        return chr(keysym & 0x00ffffff)
+    return f'<{keysym}>'
+
+# Modifier state needed to reach each index of a keycode's keysym list
+# (plain, Shift, then the AltGr levels of the first group)
+_LEVEL_STATES = {0: 0, 1: X.ShiftMask, 4: X.Mod5Mask, 5: X.ShiftMask | X.Mod5Mask}
+
+class KeyMap:
+    """
+    keysym -> (keycode, modifier state) table for one Display.
+
+    Built once from the server's keyboard mapping so looking up a key needs
+    no round trip; call handle_event() with MappingNotify events to rebuild
+    it when the layout changes.
+    """
+
+    def __init__(self, disp):
+        self.display = disp
+        self._table = {}
+        self._key_cache = {}
+        self.refresh()
+
+    def refresh(self):
+        info = self.display.display.info
+        first = info.min_keycode
+        mapping = self.display.get_keyboard_mapping(first, info.max_keycode - first + 1)
+
+        table = {}
+        keycodes = {}
+        for offset, keysyms in enumerate(mapping):
+            keycode = first + offset
+            keycodes[keycode] = list(keysyms)
+            for index, state in _LEVEL_STATES.items():
+                if index < len(keysyms):
+                    keysym = keysyms[index]
+                    # Keep the simplest way of typing each keysym
+                    if keysym and (keysym not in table or bin(table[keysym][1]).count('1') > bin(state).count('1')):
+                        table[keysym] = (keycode, state)
+        self._table = table
+        self._keycodes = keycodes
+        self._key_cache = {}
+        self._key_str_cache = {}
+
+    def lookup(self, keysym):
+        """Returns (keycode, state) for a keysym, or None if it is not on the keyboard."""
+        return self._table.get(keysym)
+
+    def lookup_key_str(self, key_str):
+        """Returns (keycode, state) for a recorded key string, or None."""
+        try:
+            return self._key_cache[key_str]
+        except KeyError:
+            result = self._table.get(key_str_to_keysym(key_str))
+            self._key_cache[key_str] = result
+            return result
+
+    def key_str_for(self, keycode, state):
+        """Returns the recorded key string for a keycode pressed with modifier `state`."""
+        level = (1 if state & X.ShiftMask else 0) | (4 if state & X.Mod5Mask else 0)
+        try:
+            return self._key_str_cache[keycode, level]
+        except KeyError:
+            pass
+        keysyms = self._keycodes.get(keycode, ())
+        keysym = 0
+        # Fall back to the unshifted / non-AltGr levels the key actually has
+        for index in (level, level & 1, 0):
+            if index < len(keysyms) and keysyms[index]:
+                keysym = keysyms[index]
+                break
+        result = keysym_to_key_str(keysym) if keysym else f'<{keycode}>'
+        self._key_str_cache[keycode, level] = result
+        return result
+
+    def handle_event(self, ev):
+        """Rebuilds the table on a keyboard MappingNotify. Returns True if it changed."""
+        if ev.type == X.MappingNotify and ev.request == X.MappingKeyboard:
+            self.display.refresh_keyboard_mapping(ev)
+            self.refresh()
+            return True
+        return False
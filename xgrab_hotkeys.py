@@ -0,0 +1,183 @@
+import threading
+import time
+from itertools import combinations
+from Xlib import error, X
+from Xlib.protocol import event as xevent
+from hotkey_listener import HotkeyListener, MOD_SHIFT, MOD_CTRL, MOD_ALT, MOD_SUPER, MOD_ALTGR, format_hotkey
+from x_connection import connections
+from x_keymap import key_str_to_keysym
+
+# Commands other threads send to the listener thread, as the first word of a ClientMessage
+_WAKE_STOP = 1
+_WAKE_REGRAB = 2
+
+X_MODIFIERS = {MOD_SHIFT: X.ShiftMask, MOD_CTRL: X.ControlMask, MOD_ALT: X.Mod1Mask, MOD_SUPER: X.Mod4Mask,
+               MOD_ALTGR: X.Mod5Mask}
+
+# Caps Lock and Num Lock (Mod2 on nearly every layout) must not stop a hotkey
+# from matching, so each combo is also grabbed with them on
+_LOCK_MASKS = (X.LockMask, X.Mod2Mask)
+_LOCK_VARIANTS = [sum(combo) for n in range(len(_LOCK_MASKS) + 1) for combo in combinations(_LOCK_MASKS, n)]
+_CHORD_STATE = sum(X_MODIFIERS.values()) # Lock and mouse button bits are ignored when matching
+
+def x_modifier_mask(mods):
+    return sum(mask for bit, mask in X_MODIFIERS.items() if mods & bit)
+
+class XGrabHotkeyListener(HotkeyListener):
+    """
+    Hotkeys through XGrabKey on the root window instead of a global keyboard hook.
+
+    Only the configured combos are grabbed, so the X server delivers just
+    those key presses, and only to us; other typing never reaches this
+    process. The thread blocks on its own connection and queues the action
+    as soon as the KeyPress arrives. Once the thread runs, only it uses that
+    connection: stop() and update_hotkeys() send it a ClientMessage from
+    another connection, which also wakes the blocked next_event(). Callbacks
+    run on the same worker as in HotkeyListener.
+
+    Unlike the pynput listener a plain hotkey only fires without other
+    modifiers held (apart from Caps Lock and Num Lock). The constructor
+    raises if the server refuses a grab (e.g. another program owns the
+    combo); create_hotkey_listener() then falls back to HotkeyListener.
+    """
+
+    def __init__(self, hotkeys, callbacks, display_name=None):
+        super().__init__(hotkeys, callbacks)
+        self.display_name = display_name
+        self.connection = connections.acquire(display_name)
+        self.display = self.connection.display
+        self.root = self.display.screen().root
+        self._grab_lock = threading.Lock()
+        self._grabs = {} # (keycode, X modifier mask) -> action
+        try:
+            failed = self._grab_all()
+        except Exception:
+            connections.release(self.connection)
+            raise
+        if failed:
+            self._ungrab_all()
+            connections.release(self.connection)
+            raise RuntimeError(f"could not grab {', '.join(failed)}")
+        # Private window the commands are sent to; with no event mask they reach its creator, us
+        self._wake_window = self.root.create_window(-1, -1, 1, 1, 0, X.CopyFromParent, X.InputOnly, X.CopyFromParent)
+        self._wake_atom = self.display.intern_atom('_AUTOCLICKER_WAKE')
+
+    def _grab_all(self):
+        """Grabs every hotkey in the dispatch table. Returns the hotkeys that failed."""
+        failed = []
+        with self._grab_lock:
+            for (mods, key_str), action in self._table.items():
+                keysym = key_str_to_keysym(key_str)
+                keycode = self.display.keysym_to_keycode(keysym) if keysym else 0
+                if not keycode:
+                    failed.append(format_hotkey(mods, key_str))
+                    continue
+                modifiers = x_modifier_mask(mods)
+                catch = error.CatchError(error.BadAccess)
+                for lock in _LOCK_VARIANTS:
+                    self.root.grab_key(keycode, modifiers | lock, False, X.GrabModeAsync, X.GrabModeAsync,
+                                       onerror=catch)
+                self.display.sync() # One round trip per hotkey, to learn whether it was ours
+                if catch.get_error():
+                    for lock in _LOCK_VARIANTS:
+                        self.root.ungrab_key(keycode, modifiers | lock)
+                    failed.append(format_hotkey(mods, key_str))
+                    continue
+                self._grabs[(keycode, modifiers)] = action
+            self.display.flush()
+        return failed
+
+    def _ungrab_all(self):
+        with self._grab_lock:
+            for keycode, modifiers in self._grabs:
+                for lock in _LOCK_VARIANTS:
+                    self.root.ungrab_key(keycode, modifiers | lock)
+            self._grabs = {}
+            self.display.flush()
+
+    def run(self):
+        """Waits for grabbed key presses and commands; uses no CPU in between."""
+        self._worker.start()
+        try:
+            while True:
+                ev = self.display.next_event()
+                if ev.type == X.KeyPress:
+                    start = time.perf_counter_ns()
+                    action = self._grabs.get((ev.detail, ev.state & _CHORD_STATE))
+                    if action is not None:
+                        self._queue.put(action)
+                    self.keystrokes += 1
+                    self.press_ns += time.perf_counter_ns() - start
+                elif ev.type == X.ClientMessage and ev.window.id == self._wake_window.id:
+                    command = ev.data[1][0]
+                    if command == _WAKE_STOP:
+                        break
+                    if command == _WAKE_REGRAB:
+                        self._ungrab_all()
+                        self._report(self._grab_all())
+                elif ev.type == X.MappingNotify and ev.request == X.MappingKeyboard:
+                    # Keycodes may have moved: grab the same combos again
+                    self.display.refresh_keyboard_mapping(ev)
+                    self._ungrab_all()
+                    self._report(self._grab_all())
+            self._release()
+        except error.ConnectionClosedError as e:
+            print(f"Hotkey grabs stopped: {e}")
+            self.connection.close()
+
+    def _release(self):
+        """Drops the grabs and the wake window and returns the connection to the pool."""
+        self._ungrab_all()
+        self._wake_window.destroy()
+        connections.release(self.connection)
+
+    def _report(self, failed):
+        if failed:
+            print(f"Could not grab hotkeys {', '.join(failed)}; another program may be using them.")
+
+    def _send(self, command):
+        """Sends `command` to the listener thread over a connection of our own."""
+        connection = connections.acquire(self.display_name)
+        try:
+            window = connection.display.create_resource_object('window', self._wake_window.id)
+            message = xevent.ClientMessage(window=window, client_type=self._wake_atom, data=(32, [command, 0, 0, 0, 0]))
+            window.send_event(message, event_mask=0, onerror=error.CatchError(error.BadWindow))
+            connection.display.flush()
+        finally:
+            connections.release(connection)
+
+    def stop(self):
+        """Releases the grabs and ends the thread."""
+        self._queue.put(None)
+        try:
+            if self.ident is None:
+                self._release() # Never started
+            elif self.is_alive():
+                self._send(_WAKE_STOP) # The thread releases everything on its way out
+                self.join(1.0)
+        except (error.ConnectionClosedError, OSError):
+            self.connection.close()
+
+    def update_hotkeys(self, new_hotkeys):
+        """Updates the hotkeys on the fly: the old combos are released and the new ones grabbed."""
+        super().update_hotkeys(new_hotkeys)
+        if self.ident is None:
+            self._ungrab_all()
+            self._report(self._grab_all())
+        elif self.is_alive():
+            self._send(_WAKE_REGRAB)
+
+
+if __name__ == '__main__':
+    hotkey_config = {"record": "Key.f1", "stop": "Key.f2", "play": "Key.ctrl+Key.alt+Key.f3"}
+    callback_map = {action: (lambda a=action: print(f"{a} action triggered!")) for action in hotkey_config}
+
+    listener = XGrabHotkeyListener(hotkeys=hotkey_config, callbacks=callback_map)
+    listener.start()
+    print(f"Grabbed {len(listener._grabs)} hotkeys. Press F1, F2 or Ctrl+Alt+F3; Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        listener.stop()
+        print(f"\n{listener.keystrokes} hotkey presses, {listener.overhead_ns():.0f} ns each to dispatch")
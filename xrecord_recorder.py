@@ -0,0 +1,166 @@
+import struct
+import threading
+from Xlib import X, display
+from Xlib.ext import record
+from recorder import Recorder
+from x_connection import connections
+from x_keymap import KeyMap
+
+# Core device events as they arrive in RECORD data: type, detail, sequence,
+# time, root, event, child, root x/y, event x/y, state, same_screen, pad
+_DEVICE_EVENT = struct.Struct('=BBHLLLLhhhhHBx')
+
+BUTTON_NAMES = {1: 'Button.left', 2: 'Button.middle', 3: 'Button.right'}
+
+# Wheel buttons -> (dx, dy), as pynput reports them
+SCROLL_BUTTONS = {4: (0, 1), 5: (0, -1), 6: (-1, 0), 7: (1, 0)}
+
+class XRecordRecorder(Recorder):
+    """
+    Recorder that captures input with the X RECORD extension instead of pynput.
+
+    One recording context on one data connection delivers every key, button
+    and motion event. Raw packets are decoded with struct in bulk and
+    timestamped with the X server's own event time, so delays between events
+    are exact and free of wall-clock skew. A second, idle connection is only
+    used to end the recording (the data connection blocks while recording).
+    Emits the same event schema as Recorder.
+    """
+
+    def __init__(self, action_callback, record_motion=False, simplify="rdp", epsilon=2.0,
+                 journal_path=None, relative_to=None, display_name=None):
+        super().__init__(action_callback, record_motion=record_motion, simplify=simplify,
+                         epsilon=epsilon, journal_path=journal_path, relative_to=relative_to,
+                         display_name=display_name)
+
+    def _create_listeners(self):
+        self.control_connection = connections.acquire(self.display_name)
+        self.control_display = self.control_connection.display
+        if not self.control_display.has_extension('RECORD'):
+            connections.release(self.control_connection)
+            raise RuntimeError("The X server does not support the RECORD extension.")
+        self.keymap = KeyMap(self.control_display)
+        self._context = None
+        self._thread = None
+        self._last_ms = None
+        self._wraps = 0
+        try:
+            # Set up everything that can fail here, so that the constructor
+            # raises and the caller can fall back to pynput
+            self._create_context()
+            # Not pooled: an enabled RECORD context ties up its connection for good
+            self.data_display = display.Display(self.display_name)
+        except Exception:
+            if self._context is not None:
+                self.control_display.record_free_context(self._context)
+                self._context = None
+            connections.release(self.control_connection)
+            raise
+
+    def _create_context(self):
+        last_event = X.MotionNotify if self.record_motion else X.ButtonRelease
+        self._context = self.control_display.record_create_context(
+            0, [record.AllClients],
+            [{
+                'core_requests': (0, 0),
+                'core_replies': (0, 0),
+                'ext_requests': (0, 0, 0, 0),
+                'ext_replies': (0, 0, 0, 0),
+                'delivered_events': (0, 0),
+                'device_events': (X.KeyPress, last_event),
+                'errors': (0, 0),
+                'client_started': False,
+                'client_died': False,
+            }])
+        # CreateContext has no reply; asking for the context back surfaces any error now
+        self.control_display.record_get_context(self._context)
+
+    def _start_capture(self):
+        self._thread = threading.Thread(target=self._record_loop, daemon=True)
+        self._thread.start()
+
+    def _record_loop(self):
+        # Blocks until the context is disabled from the control connection
+        try:
+            self.data_display.record_enable_context(self._context, self._handle_reply)
+            self.data_display.record_free_context(self._context)
+        except Exception as e:
+            print(f"XRecord capture failed: {e}")
+        finally:
+            self.data_display.close()
+
+    def _stop_capture(self):
+        if self._context is not None:
+            if self._thread is not None:
+                self.control_display.record_disable_context(self._context)
+                self.control_display.flush()
+                self._thread.join()
+            else:
+                # Never started: the context was created but not enabled
+                self.control_display.record_free_context(self._context)
+                self.control_display.flush()
+                self.data_display.close()
+            self._context = None
+        connections.release(self.control_connection)
+
+    def _seconds(self, ms):
+        """X server time (ms, wraps every ~49.7 days) -> monotonic seconds."""
+        if self._last_ms is not None and ms < self._last_ms:
+            self._wraps += 1
+        self._last_ms = ms
+        return (self._wraps * 0x100000000 + ms) / 1000.0
+
+    def _handle_reply(self, reply):
+        if reply.category == record.StartOfData:
+            # Delays are measured on the server clock from here on
+            self._start_time = self._seconds(reply.server_time)
+            return
+        if reply.category != record.FromServer or reply.client_swapped:
+            return
+
+        data = reply.data
+        usable = len(data) - len(data) % _DEVICE_EVENT.size
+        for (ev_type, detail, _, ms, _, _, _, x, y, _, _, state, _) in _DEVICE_EVENT.iter_unpack(data[:usable]):
+            ev_type &= 0x7f
+            at = self._seconds(ms)
+            if ev_type == X.MotionNotify:
+                self.on_move(x, y, at=at)
+            elif ev_type == X.ButtonPress or ev_type == X.ButtonRelease:
+                scroll = SCROLL_BUTTONS.get(detail)
+                if scroll is not None:
+                    # Wheel "clicks" come as press/release pairs; count the press only
+                    if ev_type == X.ButtonPress and self.record_motion:
+                        self.on_scroll(x, y, scroll[0], scroll[1], at=at)
+                    continue
+                button = BUTTON_NAMES.get(detail, f'Button.button{detail}')
+                self.on_click(x, y, button, ev_type == X.ButtonPress, at=at)
+            elif ev_type == X.KeyPress:
+                self._process_events()
+                self.on_key_str(self.keymap.key_str_for(detail, state), at=at)
+
+    def _process_events(self):
+        """
+        Rebuilds the KeyMap on a keyboard MappingNotify (e.g. a layout switch
+        while recording). Every client gets those without selecting them;
+        the control connection is not read anywhere else, so they wait there.
+        """
+        display = self.control_display
+        while display.pending_events():
+            self.keymap.handle_event(display.next_event())
+
+
+if __name__ == '__main__':
+    import time
+
+    def print_action(action):
+        print(action)
+
+    recorder = XRecordRecorder(action_callback=print_action, record_motion=True)
+    recorder.start()
+    print("Recording with XRecord. Click and type to see events. Press Ctrl+C to stop.")
+    try:
+        while True:
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        events = recorder.stop()
+        print(f"\nRecorder stopped, {len(events)} events.")
@@ -0,0 +1,120 @@
+from Xlib import X
+from Xlib.ext import xtest
+from x_connection import connections
+from x_keymap import key_str_to_keysym
+
+def scroll_buttons(dx, dy):
+    """Maps a scroll amount to (X button, clicks) pairs: 4/5 vertical, 6/7 horizontal."""
+    buttons = []
+    if dy:
+        buttons.append((4 if dy > 0 else 5, abs(int(dy))))
+    if dx:
+        buttons.append((7 if dx > 0 else 6, abs(int(dx))))
+    return buttons
+
+class XTestBackend:
+    """
+    Foreground input injection through the XTEST extension.
+
+    All fake motion/button/key requests go to one persistent Display and are
+    only queued; nothing is sent until flush() (or sync(), which also waits
+    for the server to process them). This lets dense macros go out in
+    batches instead of paying round trips per event.
+    """
+
+    name = "xtest"
+
+    def __init__(self, display_name=None):
+        # Pooled: returned to the connection manager by close() or when the backend is dropped
+        self.connection, self._release = connections.lease(self, display_name)
+        self.display = self.connection.display
+        if not self.display.has_extension(xtest.extname):
+            self._release()
+            raise RuntimeError("The X server does not support the XTEST extension.")
+        self._fake_input = self.display.xtest_fake_input
+        self._shift_keycode = self.display.keysym_to_keycode(key_str_to_keysym('Key.shift'))
+
+    def resolve_button(self, button_str):
+        if 'left' in button_str:
+            return 1
+        elif 'right' in button_str:
+            return 3
+        elif 'middle' in button_str:
+            return 2
+        return None
+
+    def resolve_key(self, key_str):
+        """Returns (keycode, needs_shift) for a recorded key string, or None if it is not on the keyboard."""
+        keysym = key_str_to_keysym(key_str)
+        if not keysym:
+            return None
+        for keycode, index in self.display.keysym_to_keycodes(keysym):
+            if index in (0, 1):
+                return (keycode, index == 1)
+        return None
+
+    def click(self, x, y, button):
+        fake_input = self._fake_input
+        fake_input(X.MotionNotify, x=x, y=y)
+        fake_input(X.ButtonPress, button)
+        fake_input(X.ButtonRelease, button)
+
+    def move(self, x, y):
+        self._fake_input(X.MotionNotify, x=x, y=y)
+
+    def scroll(self, x, y, dx, dy):
+        fake_input = self._fake_input
+        fake_input(X.MotionNotify, x=x, y=y)
+        for button, count in scroll_buttons(dx, dy):
+            for _ in range(count):
+                fake_input(X.ButtonPress, button)
+                fake_input(X.ButtonRelease, button)
+
+    def press_button(self, x, y, button):
+        self._fake_input(X.MotionNotify, x=x, y=y)
+        self._fake_input(X.ButtonPress, button)
+
+    def release_button(self, x, y, button):
+        self._fake_input(X.MotionNotify, x=x, y=y)
+        self._fake_input(X.ButtonRelease, button)
+
+    def tap_key(self, key):
+        keycode, needs_shift = key
+        fake_input = self._fake_input
+        if needs_shift:
+            fake_input(X.KeyPress, self._shift_keycode)
+        fake_input(X.KeyPress, keycode)
+        fake_input(X.KeyRelease, keycode)
+        if needs_shift:
+            fake_input(X.KeyRelease, self._shift_keycode)
+
+    def flush(self):
+        """Sends all queued requests without waiting."""
+        self.display.flush()
+
+    def sync(self):
+        """Sends all queued requests and waits until the server has processed them."""
+        self.display.sync()
+
+    def close(self):
+        self._release()
+
+
+if __name__ == '__main__':
+    # Benchmark against the pynput path, e.g. under Xvfb:
+    #   Xvfb :99 & DISPLAY=:99 python3 xtest_backend.py
+    import time
+    from player import PynputBackend
+
+    count = 5000
+    for backend in (PynputBackend(), XTestBackend()):
+        button = backend.resolve_button('Button.left')
+        start = time.perf_counter()
+        for i in range(count):
+            backend.click(i % 500, i % 300, button)
+            if i % 64 == 63:
+                backend.flush()
+        backend.sync()
+        elapsed = time.perf_counter() - start
+        print(f"{backend.name}: {count} clicks in {elapsed:.3f} s ({count / elapsed:.0f} clicks/s)")
+        backend.close()